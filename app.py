@@ -1,5 +1,10 @@
 import streamlit as st
-from modules import i01, i34, i38, i51, i52, i53, home
+from functools import partial
+from interfaces import INTERFACE_SPECS
+from modules import i01, home, interface_page
+from parse_cache import PARSE_CACHE
+from result_store import RESULT_STORE
+from shared_frames import SHARED_FRAMES
 
 # Page configuration
 st.set_page_config(
@@ -15,21 +20,26 @@ def placeholder_page():
     st.header("Coming Soon")
     st.write("This feature is not yet implemented.")
 
-# Dictionary to map page names to their render functions from the modules
+# Dictionary to map page names to their render functions; the interface pages
+# are generated from the registry in interfaces.py
 PAGES = {
     "⚙️ Global Country Selection": home.render,
     "I01": i01.render,
-    "I34": i34.render,
-    "I38": i38.render,
-    "I51": i51.render,
-    "I52": i52.render,
-    "I53": i53.render,
+    **{name: partial(interface_page.render, spec) for name, spec in INTERFACE_SPECS.items()},
 }
 
 # Sidebar for navigation
 st.sidebar.title('Migration Processes')
 selection = st.sidebar.radio("Select a tool:", list(PAGES.keys()))
 
+# Show how often uploads were served from the shared parse cache
+st.sidebar.caption(
+    f"Parse cache: {PARSE_CACHE.hits} hits, {PARSE_CACHE.misses} misses, "
+    f"{PARSE_CACHE.nbytes / 1024 ** 2:.0f} MB"
+)
+st.sidebar.caption(f"Shared reference frames: {len(SHARED_FRAMES)}, {SHARED_FRAMES.nbytes / 1024 ** 2:.0f} MB")
+st.sidebar.caption(f"Stored results: {RESULT_STORE.nbytes / 1024 ** 2:.0f} MB on disk")
+
 # Get the function to render the selected page
 page_function = PAGES[selection]
 
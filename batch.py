@@ -0,0 +1,226 @@
+"""
+Runs all interfaces headless, without the Streamlit UI.
+
+Reads the input CSVs from one directory, runs every interface whose inputs are
+present and writes one archive per interface, e.g.:
+
+    python batch.py --input-dir extracts/ --countries GB,IE,NL --output-dir out/
+
+Input files are named after their schema, e.g. RF01.csv, HOS01.csv, I34_RF.csv,
+I38_RF.csv, I38_HOS.csv, I37_HOS.csv (case-insensitive). HOS reference files
+that are not in the directory are taken from the snapshot store when --quarter
+is given.
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import pandas as pd
+
+from engines import DEFAULT_ENGINE, ENGINES
+from instrumentation import stage, track_run
+from interfaces import INTERFACE_SPECS
+from modules import i01
+from output_cache import OUTPUT_CACHE
+from pipeline import output_files, process
+from reference_store import REFERENCE_FILES, Snapshot, list_quarters, load_snapshot
+from schemas import SCHEMAS
+from utils import DEFAULT_EXPORT_FORMAT, EXPORT_FORMATS, read_csv_filtered, write_zip
+
+logger = logging.getLogger("batch")
+
+def _i01_files(rf01_df, hos01_df, countries):
+    return i01.export_files(*i01.process_data(rf01_df, hos01_df, countries))
+
+def _spec_files(spec):
+    def build(*args, **kwargs):
+        # The inputs in the order of spec.inputs, then the countries
+        *dfs, countries = args
+        return output_files(spec, process(spec, dict(zip(spec.schemas, dfs)), countries, **kwargs))
+    return build
+
+# Interfaces by name: (schema keys of the inputs, in processing order; builder of the output files).
+INTERFACES = {
+    "I01": (("RF01", "HOS01"), _i01_files),
+    **{name: (spec.schemas, _spec_files(spec)) for name, spec in INTERFACE_SPECS.items()},
+}
+
+# Interfaces that match keys with a selectable engine (see engines.py).
+ENGINE_INTERFACES = tuple(name for name, spec in INTERFACE_SPECS.items() if spec.match)
+
+# Accepted input file names besides the plain CSV, e.g. "I38_HOS.csv.gz".
+COMPRESSED_SUFFIXES = (".csv.gz", ".csv.zst", ".zip")
+
+def input_file_name(name: str) -> str:
+    """Returns the expected CSV file name for a schema key, e.g. "I38_HOS.csv"."""
+    return SCHEMAS[name].name.replace(" ", "_") + ".csv"
+
+def find_inputs(input_dir: str, quarter: str | None = None) -> dict:
+    """
+    Returns the available inputs by schema key: a CSV path, or a Snapshot for
+    reference files that are only in the snapshot store. A compressed CSV
+    (see COMPRESSED_SUFFIXES) is used when the plain CSV is not there.
+    """
+    files_by_name = {entry.lower(): os.path.join(input_dir, entry) for entry in os.listdir(input_dir)}
+    sources = {}
+    for name in SCHEMAS:
+        base_name = input_file_name(name).lower().removesuffix(".csv")
+        candidates = [f"{base_name}.csv"] + [base_name + suffix for suffix in COMPRESSED_SUFFIXES]
+        path = next((files_by_name[c] for c in candidates if c in files_by_name), None)
+        if path:
+            sources[name] = path
+        elif quarter and name in REFERENCE_FILES and quarter in list_quarters(name):
+            sources[name] = Snapshot(name, quarter)
+    return sources
+
+def input_columns(name: str, interfaces) -> tuple[str, ...] | None:
+    """
+    Returns the columns the interfaces need from the input `name` (see
+    InterfaceSpec.input_columns), or None if one of them reads it whole.
+    """
+    columns = {}
+    for interface in interfaces:
+        if name not in INTERFACES[interface][0]:
+            continue
+        needed = INTERFACE_SPECS[interface].input_columns(name) if interface in INTERFACE_SPECS else None
+        if needed is None:
+            return None
+        columns.update(dict.fromkeys(needed))
+    return tuple(columns) if columns else None
+
+def load_input(source, name: str, countries, columns=None) -> pd.DataFrame:
+    """
+    Loads the rows for the selected countries from a CSV path or a snapshot.
+
+    Args:
+        columns: The columns to parse, or None for all of them.
+
+    Raises:
+        SchemaError: If the file has no header row with the required columns.
+    """
+    if isinstance(source, Snapshot):
+        return load_snapshot(source, countries, columns=columns)
+    schema = SCHEMAS[name] if columns is None else SCHEMAS[name].select(columns)
+    header_row = schema.header_row(source)
+    read_kwargs = {'skiprows': header_row} if header_row else {}
+    if columns is not None:
+        read_kwargs['usecols'] = columns
+    return read_csv_filtered(source, countries, dtype=schema.dtypes, **read_kwargs)
+
+def run_graph(jobs: dict, max_workers: int | None = None) -> tuple[dict, dict]:
+    """
+    Runs jobs on a thread pool as soon as the jobs they depend on have finished.
+
+    Args:
+        jobs: Jobs by name, each a (dependency names, function) pair. The function
+            is called with the results of its dependencies, in order.
+        max_workers: The thread pool size.
+
+    Returns:
+        tuple[dict, dict]: The results and the exceptions, by job name. Jobs whose
+        dependencies failed are reported as failed too, without running.
+    """
+    results, errors = {}, {}
+    pending = dict(jobs)
+    running = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while pending or running:
+            for name, (deps, func) in list(pending.items()):
+                failed = [dep for dep in deps if dep in errors]
+                if failed:
+                    errors[name] = RuntimeError(f"skipped because {', '.join(failed)} failed")
+                    del pending[name]
+                elif all(dep in results for dep in deps):
+                    running[executor.submit(func, *(results[dep] for dep in deps))] = name
+                    del pending[name]
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    results[name] = future.result()
+                except Exception as e:
+                    errors[name] = e
+    return results, errors
+
+def build_jobs(sources: dict, countries, output_dir: str, fmt: str, interfaces, cache=None,
+               engine: str = DEFAULT_ENGINE) -> dict:
+    """
+    Builds the job graph: one parse job per input, shared by every interface that
+    reads it, and one job per interface that processes and writes its archive.
+    With an output cache, archives are written incrementally (see utils.write_zip).
+    """
+    jobs = {}
+
+    def parse_job(name):
+        def parse():
+            started = time.perf_counter()
+            with track_run(f"parse {name}"), stage(f"parse {SCHEMAS[name].name}") as s:
+                df = load_input(sources[name], name, countries, input_columns(name, interfaces))
+                s.rows_out = len(df)
+            logger.info("Parsed %s: %d rows in %.1fs", name, len(df), time.perf_counter() - started)
+            return df
+        return parse
+
+    def interface_job(interface, build_files):
+        def run(*dfs):
+            started = time.perf_counter()
+            path = os.path.join(output_dir, f"{interface}_Output.zip")
+            # Each job runs in its own pool thread, so its stages go to its own run
+            options = {"engine": engine} if interface in ENGINE_INTERFACES else {}
+            with track_run(interface):
+                files = build_files(*dfs, countries, **options)
+                manifest = write_zip(files, path, fmt=fmt, cache=cache) if files else None
+            logger.info("Wrote %s: %d files in %.1fs", path, len(files), time.perf_counter() - started)
+            if manifest:
+                logger.info("%s: rebuilt %d files, reused %d", interface, len(manifest["rebuilt"]), len(manifest["reused"]))
+            return path if files else None
+        return run
+
+    for interface in interfaces:
+        inputs, build_files = INTERFACES[interface]
+        missing = [name for name in inputs if name not in sources]
+        if missing:
+            logger.warning("Skipping %s: no %s input", interface, ", ".join(input_file_name(n) for n in missing))
+            continue
+        for name in inputs:
+            jobs.setdefault(f"parse:{name}", ((), parse_job(name)))
+        jobs[interface] = (tuple(f"parse:{name}" for name in inputs), interface_job(interface, build_files))
+    return jobs
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run the RF 2 HOS interfaces without the UI.")
+    parser.add_argument("--input-dir", required=True, help="Directory with the input CSV files.")
+    parser.add_argument("--countries", required=True, help="Comma-separated country codes, e.g. GB,IE,NL.")
+    parser.add_argument("--output-dir", required=True, help="Directory to write the output archives to.")
+    parser.add_argument("--interfaces", default=",".join(INTERFACES), help="Comma-separated interfaces to run.")
+    parser.add_argument("--quarter", help="Use stored HOS snapshots of this quarter for missing reference files.")
+    parser.add_argument("--format", default=DEFAULT_EXPORT_FORMAT, choices=list(EXPORT_FORMATS), help="Output file format.")
+    parser.add_argument("--engine", default=DEFAULT_ENGINE, choices=list(ENGINES), help="Engine to match records with.")
+    parser.add_argument("--incremental", action="store_true", help="Reuse unchanged country files from the output cache.")
+    parser.add_argument("--workers", type=int, default=None, help="Number of jobs to run in parallel.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    countries = [c.strip() for c in args.countries.split(",") if c.strip()]
+    interfaces = [i.strip().upper() for i in args.interfaces.split(",") if i.strip()]
+    unknown = [i for i in interfaces if i not in INTERFACES]
+    if unknown:
+        parser.error(f"unknown interfaces: {unknown}")
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    sources = find_inputs(args.input_dir, args.quarter)
+    cache = OUTPUT_CACHE if args.incremental else None
+    jobs = build_jobs(sources, countries, args.output_dir, args.format, interfaces, cache, args.engine)
+    _, errors = run_graph(jobs, args.workers)
+
+    for name, error in errors.items():
+        logger.error("%s failed: %s", name, error)
+    return 1 if errors else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+"""
+Checks that every engine in engines.ENGINES returns the same frames as pandas.
+
+    python -m benchmarks.parity --scales 1000,100000
+
+Runs each engine-aware interface on synthetic data at every scale, plus a small
+dataset of edge cases, and exits non-zero if any engine's output differs.
+tests/test_pipeline.py runs the same comparison on small data under pytest.
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from batch import ENGINE_INTERFACES
+from benchmarks.synthetic import country_codes, generate_dataset
+from engines import DEFAULT_ENGINE, ENGINES
+from interfaces import INTERFACE_SPECS
+from pipeline import process
+from schemas import SCHEMAS
+
+def edge_case_dataset() -> dict[str, pd.DataFrame]:
+    """
+    Returns small frames covering duplicate keys, missing key values, codes that
+    parse as numbers in one file and text in another, and keys found in only
+    some of the reference files.
+    """
+    frames = generate_dataset(200, 4, duplicate_rate=0.3, seed=1)
+    for name in ("I38", "I38_HOS", "I37", "I51", "I52", "I36", "I53", "I35"):
+        df = frames[name].copy()
+        df.loc[df.index[:3], "Attribute Value Code"] = np.nan
+        df.loc[df.index[3:6], "Country"] = np.nan
+        frames[name] = df
+    numeric_codes = pd.Series(["100", "200", "300"])
+    for name in ("I38", "I38_HOS", "I37"):
+        extra = frames[name].iloc[:3].copy()
+        extra["Attribute Value Code"] = numeric_codes.to_numpy() if name == "I38" else numeric_codes.astype(int).to_numpy()
+        extra["Country"] = "HK"
+        frames[name] = pd.concat([frames[name], extra], ignore_index=True)
+    return frames
+
+def with_schema_dtypes(frames: dict[str, pd.DataFrame]) -> dict[str, pd.DataFrame]:
+    """Converts the frames to the dtypes they are parsed with."""
+    return {
+        name: df.astype({col: dtype for col, dtype in SCHEMAS[name].dtypes.items() if col in df.columns})
+        for name, df in frames.items()
+    }
+
+def check(frames: dict[str, pd.DataFrame], selected_countries, label: str) -> int:
+    """
+    Runs every engine-aware interface with each engine and compares the output
+    to the default engine's. Returns the number of mismatches.
+    """
+    failures = 0
+    for interface in ENGINE_INTERFACES:
+        spec = INTERFACE_SPECS[interface]
+        expected = process(spec, frames, selected_countries, engine=DEFAULT_ENGINE)
+        for engine in ENGINES:
+            if engine == DEFAULT_ENGINE:
+                continue
+            try:
+                pd.testing.assert_frame_equal(process(spec, frames, selected_countries, engine=engine), expected)
+                status = "ok"
+            except AssertionError as e:
+                failures += 1
+                status = f"MISMATCH\n{e}"
+            print(f"{label:<16} {interface} [{engine}] {len(expected)} rows: {status}")
+    return failures
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Check that all engines return identical results.")
+    parser.add_argument("--scales", default="1000,100000", help="Comma-separated rows per attribute file.")
+    parser.add_argument("--countries", type=int, default=40, help="Countries in the synthetic files.")
+    parser.add_argument("--selected", type=int, default=5, help="Countries selected for processing.")
+    args = parser.parse_args(argv)
+
+    if len(ENGINES) == 1:
+        print(f"Only the {DEFAULT_ENGINE} engine is installed; nothing to compare.")
+        return 0
+
+    failures = check(with_schema_dtypes(edge_case_dataset()), country_codes(4), "edge cases")
+    for n_rows in (int(scale) for scale in args.scales.split(",")):
+        frames = with_schema_dtypes(generate_dataset(n_rows, args.countries))
+        failures += check(frames, country_codes(args.countries)[:args.selected], f"rows={n_rows}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
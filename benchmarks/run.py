@@ -0,0 +1,141 @@
+"""
+Times and memory-profiles the processing and export paths on synthetic data.
+
+    python -m benchmarks.run --scales 10000,100000 --output benchmarks/results.jsonl
+    python -m benchmarks.run --scales 10000 --compare benchmarks/results.jsonl
+
+Each result is appended as one JSON line, so runs from different commits can be
+compared with --compare.
+"""
+import argparse
+import io
+import json
+import platform
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from benchmarks.synthetic import country_codes, generate_dataset
+from engines import DEFAULT_ENGINE, ENGINES
+from interfaces import INTERFACE_SPECS
+from modules import i01
+from pipeline import process
+from utils import partition_by_country, read_csv_filtered, to_excel, to_zip
+
+def measure(func, repeat: int = 3) -> dict:
+    """
+    Runs `func` `repeat` times for the fastest wall time, then once more under
+    tracemalloc for the peak memory it allocates.
+    """
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - started)
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"seconds": min(times), "peak_mb": peak / 1024 ** 2}
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def benchmark_cases(frames: dict[str, pd.DataFrame], selected_countries: list[str]):
+    """
+    Yields (name, function) pairs for every benchmarked path.
+    """
+    csv_bytes = frames["I38"].to_csv(index=False).encode('utf-8-sig')
+    yield "read_csv_filtered", lambda: read_csv_filtered(io.BytesIO(csv_bytes), selected_countries)
+
+    yield "I01.process_data", lambda: i01.process_data(frames["RF01"], frames["HOS01"], selected_countries)
+    for interface, spec in INTERFACE_SPECS.items():
+        yield f"{interface}.process_data", lambda spec=spec: process(spec, frames, selected_countries)
+        if spec.match:
+            for engine in ENGINES:
+                if engine != DEFAULT_ENGINE:
+                    yield (f"{interface}.process_data[{engine}]",
+                           lambda spec=spec, engine=engine: process(spec, frames, selected_countries, engine=engine))
+
+    files = partition_by_country(frames["I38"][frames["I38"]["Country"].isin(selected_countries)], "I38")
+    first_file = next(iter(files.values()))
+    yield "utils.to_excel", lambda: to_excel(first_file)
+    yield "utils.to_zip", lambda: to_zip(files)
+
+def run(scales, n_countries, n_selected, repeat, seed=0):
+    """
+    Runs every benchmark at each scale and returns one result dict per case.
+    """
+    commit = git_commit()
+    selected_countries = country_codes(n_countries)[:n_selected]
+    results = []
+    for n_rows in scales:
+        frames = generate_dataset(n_rows, n_countries, seed=seed)
+        for name, func in benchmark_cases(frames, selected_countries):
+            result = {
+                "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "commit": commit,
+                "python": platform.python_version(),
+                "pandas": pd.__version__,
+                "benchmark": name,
+                "rows": n_rows,
+                "countries": n_countries,
+                "selected": n_selected,
+                **measure(func, repeat),
+            }
+            print(f"{name:<24} rows={n_rows:<9} {result['seconds']:8.3f}s {result['peak_mb']:9.1f} MB peak")
+            results.append(result)
+    return results
+
+def compare(results, baseline_path: str, threshold: float = 1.2):
+    """
+    Prints each result next to the latest baseline result for the same case and
+    flags slowdowns beyond `threshold`. Returns the number of regressions.
+    """
+    baseline = {}
+    with open(baseline_path) as f:
+        for line in f:
+            record = json.loads(line)
+            baseline[(record["benchmark"], record["rows"], record["countries"], record["selected"])] = record
+
+    regressions = 0
+    for result in results:
+        base = baseline.get((result["benchmark"], result["rows"], result["countries"], result["selected"]))
+        if base is None:
+            continue
+        ratio = result["seconds"] / base["seconds"] if base["seconds"] else float("inf")
+        flag = "REGRESSION" if ratio > threshold else ""
+        regressions += bool(flag)
+        print(f"{result['benchmark']:<24} rows={result['rows']:<9} {base['seconds']:8.3f}s -> {result['seconds']:8.3f}s ({ratio:5.2f}x) {flag}")
+    return regressions
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the RF 2 HOS processing and export paths.")
+    parser.add_argument("--scales", default="10000,100000", help="Comma-separated rows per attribute file.")
+    parser.add_argument("--countries", type=int, default=40, help="Countries in the synthetic files.")
+    parser.add_argument("--selected", type=int, default=5, help="Countries selected for processing.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per case; the fastest is kept.")
+    parser.add_argument("--output", help="JSON lines file to append the results to.")
+    parser.add_argument("--compare", help="JSON lines file with baseline results to compare against.")
+    args = parser.parse_args(argv)
+
+    scales = [int(scale) for scale in args.scales.split(",")]
+    results = run(scales, args.countries, args.selected, args.repeat)
+    if args.output:
+        with open(args.output, "a") as f:
+            for result in results:
+                f.write(json.dumps(result) + "\n")
+    if args.compare:
+        return 1 if compare(results, args.compare) else 0
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
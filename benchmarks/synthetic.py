@@ -0,0 +1,158 @@
+"""
+Generates realistic RF/HOS interface files for benchmarks and dry runs.
+
+    python -m benchmarks.synthetic --rows 200000 --countries 40 --output-dir extracts/
+
+The files are named like the batch runner expects (see batch.input_file_name),
+so the output directory can be fed straight into batch.py.
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from batch import input_file_name
+from schemas import COUNTRY_MASTER_NUMERIC
+
+COUNTRY_CODES = [
+    "HK", "TW", "NZ", "AU", "BR", "CH", "CN", "IE", "IL", "IN",
+    "JP", "MX", "MY", "PL", "RO", "SA", "SG", "TH", "ZA", "ES",
+    "PT", "NL", "DK", "BE", "SE", "FI", "NO", "BD", "CA", "CZ",
+    "FR", "DE", "HU", "GR", "ID", "KE", "QA", "KR", "TR", "GB",
+    "US", "AF36", "SE36", "MY36", "ME36", "KR36", "AT", "IT",
+]
+
+# The RF51 operating-system codes excluded by I51 and converted by I52.
+OS_CODES = ["HEL_15T_IN", "HEL_30T_IN", "HEL_ING_IN", "EASYSWITCH_IN", "UQCM_IN"]
+
+ATTRIBUTE_COLUMNS = [
+    'Display Group Code', 'Country', 'Attribute Value Code', 'Attribute Value Description',
+    'Attribute Value Price Type', 'Attribute Value FP', 'Attribute Value TP', 'Attribute Value LP',
+    'Attribute Value MMFP', 'Attribute Value MMTP', 'Attribute Value MMLP', 'Attribute Deactivated YN',
+    'Customer Bank Value', 'RSM Type', 'RSM Consumption', 'Currency', 'Local FP',
+    'Price Book Name', 'Server', 'Changed On', 'Changed By',
+]
+
+def country_codes(n_countries: int) -> list[str]:
+    """Returns `n_countries` country codes, real ones first."""
+    extra = [f"X{i:02d}" for i in range(max(0, n_countries - len(COUNTRY_CODES)))]
+    return (COUNTRY_CODES + extra)[:n_countries]
+
+def _attribute_keys(rng, n_rows, countries, duplicate_rate, os_rate=0.0):
+    """Draws (Country, Attribute Value Code) pairs where about `duplicate_rate` of the rows repeat a key."""
+    n_unique = max(1, int(n_rows * (1 - duplicate_rate)))
+    key_country = rng.choice(countries, n_unique)
+    key_code = np.char.add("AV", np.arange(n_unique).astype(str)).astype(object)
+    is_os = rng.random(n_unique) < os_rate
+    key_code[is_os] = rng.choice(OS_CODES, is_os.sum())
+    rows = np.concatenate([np.arange(n_unique), rng.integers(0, n_unique, n_rows - n_unique)])
+    rng.shuffle(rows)
+    return key_country[rows], key_code[rows]
+
+def attribute_frame(rng, countries, codes) -> pd.DataFrame:
+    """Builds an attribute value file for the given keys, with the RF column layout."""
+    n_rows = len(countries)
+    codes = pd.Series(codes, dtype=object)
+    prices = rng.integers(1, 5000, n_rows).astype(float)
+    return pd.DataFrame({
+        'Display Group Code': rng.choice(["HW", "SW", "SV", "LI"], n_rows),
+        'Country': countries,
+        'Attribute Value Code': codes.to_numpy(),
+        'Attribute Value Description': ("Description " + codes.astype(str)).to_numpy(),
+        'Attribute Value Price Type': rng.choice(["Fixed", "Lookup"], n_rows),
+        'Attribute Value FP': prices,
+        'Attribute Value TP': prices * 0.9,
+        'Attribute Value LP': prices * 1.2,
+        'Attribute Value MMFP': prices,
+        'Attribute Value MMTP': prices * 0.9,
+        'Attribute Value MMLP': prices * 1.2,
+        'Attribute Deactivated YN': rng.choice(["N", "Y"], n_rows, p=[0.95, 0.05]),
+        'Customer Bank Value': rng.integers(0, 100, n_rows),
+        'RSM Type': rng.choice(["STD", "EXT", "NONE"], n_rows),
+        'RSM Consumption': rng.integers(0, 10, n_rows),
+        'Currency': rng.choice(["EUR", "USD", "GBP", "JPY"], n_rows),
+        'Local FP': prices,
+        'Price Book Name': rng.choice(["PB_MAIN", "PB_PROMO"], n_rows),
+        'Server': rng.choice(["RF01", "RF02"], n_rows),
+        'Changed On': "2026-01-15",
+        'Changed By': rng.choice(["jdoe", "asmith", "batch"], n_rows),
+    })[ATTRIBUTE_COLUMNS]
+
+def reference_frame(rng, rf_df, n_rows, match_rate) -> pd.DataFrame:
+    """
+    Builds a HOS validation file where about `match_rate` of the RF keys exist,
+    padded with keys that match nothing up to `n_rows` rows.
+    """
+    rf_keys = rf_df[['Country', 'Attribute Value Code']].drop_duplicates()
+    matched = rf_keys.sample(frac=match_rate, random_state=int(rng.integers(1 << 31)))
+    n_extra = max(0, n_rows - len(matched))
+    extra = pd.DataFrame({
+        'Country': rng.choice(rf_keys['Country'].unique(), n_extra),
+        'Attribute Value Code': np.char.add("HOS", np.arange(n_extra).astype(str)),
+    })
+    keys = pd.concat([matched, extra], ignore_index=True).sample(frac=1, random_state=int(rng.integers(1 << 31)))
+    return attribute_frame(rng, keys['Country'].to_numpy(), keys['Attribute Value Code'].to_numpy())
+
+def country_master_frame(rng, countries, rows_per_country=1) -> pd.DataFrame:
+    """Builds an RF01/HOS01 style country master file."""
+    country = np.repeat(countries, rows_per_country)
+    df = pd.DataFrame({'Country': country})
+    for col in COUNTRY_MASTER_NUMERIC:
+        df[col] = rng.random(len(country)).round(4)
+    for col in ['Server', 'Currency', 'Changed On', 'Changed By']:
+        df[col] = "x"
+    return df
+
+def generate_dataset(n_rows: int, n_countries: int, duplicate_rate: float = 0.1,
+                     match_rate: float = 0.8, seed: int = 0) -> dict[str, pd.DataFrame]:
+    """
+    Generates one frame per interface input, keyed by schema key.
+
+    Args:
+        n_rows: Rows per RF attribute file; HOS files get about the same.
+        n_countries: The number of countries spread across the rows.
+        duplicate_rate: The share of rows that repeat an earlier key.
+        match_rate: The share of RF keys found in each HOS validation file, and of
+            country master values that are unchanged between HOS01 and RF01.
+        seed: The random seed.
+    """
+    rng = np.random.default_rng(seed)
+    countries = np.array(country_codes(n_countries))
+    frames = {}
+    for name in ["I38", "I51", "I52", "I53"]:
+        os_rate = 0.05 if name == "I51" else 0.0
+        frames[name] = attribute_frame(rng, *_attribute_keys(rng, n_rows, countries, duplicate_rate, os_rate))
+    frames["I34"] = attribute_frame(rng, *_attribute_keys(rng, n_rows, countries, duplicate_rate))
+    frames["I38_HOS"] = reference_frame(rng, frames["I38"], n_rows, match_rate)
+    frames["I37"] = reference_frame(rng, pd.concat([frames["I38"], frames["I51"]]), n_rows, match_rate)
+    frames["I36"] = reference_frame(rng, pd.concat([frames["I52"], frames["I51"]]), n_rows, match_rate)
+    frames["I35"] = reference_frame(rng, frames["I53"], n_rows, match_rate)
+
+    frames["HOS01"] = country_master_frame(rng, countries)
+    rf01 = frames["HOS01"].copy()
+    changed = rng.random(rf01[list(COUNTRY_MASTER_NUMERIC)].shape) > match_rate
+    rf01[list(COUNTRY_MASTER_NUMERIC)] = rf01[list(COUNTRY_MASTER_NUMERIC)].mask(changed, rf01[list(COUNTRY_MASTER_NUMERIC)] + 1)
+    frames["RF01"] = rf01
+    return frames
+
+def write_dataset(frames: dict[str, pd.DataFrame], output_dir: str) -> None:
+    """Writes the frames as CSV files named for the batch runner."""
+    os.makedirs(output_dir, exist_ok=True)
+    for name, df in frames.items():
+        df.to_csv(os.path.join(output_dir, input_file_name(name)), index=False, encoding='utf-8-sig')
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic RF/HOS interface files.")
+    parser.add_argument("--rows", type=int, default=100_000, help="Rows per attribute file.")
+    parser.add_argument("--countries", type=int, default=40, help="Number of countries.")
+    parser.add_argument("--duplicate-rate", type=float, default=0.1, help="Share of rows repeating a key.")
+    parser.add_argument("--match-rate", type=float, default=0.8, help="Share of RF keys present in HOS files.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output-dir", required=True)
+    args = parser.parse_args(argv)
+    frames = generate_dataset(args.rows, args.countries, args.duplicate_rate, args.match_rate, args.seed)
+    write_dataset(frames, args.output_dir)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Interchangeable backends for the key matching shared by the validation modules:
+keeping the first row per key whose key also exists in the reference files.
+
+pandas is always available. polars is optional; when it is installed it runs
+the matching multi-threaded on all cores. Either way the result rows are taken
+from the input pandas frame, so the engines return identical frames.
+"""
+import numpy as np
+import pandas as pd
+
+from shared_frames import SHARED_FRAMES
+from utils import KEY_COLUMNS, composite_key, key_frame, semi_join_mask, unique_key_mask
+
+try:
+    import polars as pl
+except ImportError:  # Optional dependency
+    pl = None
+
+DEFAULT_ENGINE = "pandas"
+
+def _key_index(other: pd.DataFrame, key_cols) -> np.ndarray:
+    # Built once per shared reference frame (see shared_frames.SHARED_FRAMES)
+    return SHARED_FRAMES.derived(other, ("keys", tuple(key_cols)), lambda: pd.unique(composite_key(other, key_cols)))
+
+def _pandas_first_match(df: pd.DataFrame, others, key_cols) -> np.ndarray:
+    keys = composite_key(df, key_cols)
+    return unique_key_mask(keys) & semi_join_mask(keys, *(_key_index(other, key_cols) for other in others))
+
+def _polars_keys(df: pd.DataFrame, key_cols) -> "pl.LazyFrame":
+    return pl.from_pandas(key_frame(df, key_cols)).lazy().with_columns(pl.col(list(key_cols)).cast(pl.String))
+
+def _polars_key_index(other: pd.DataFrame, key_cols) -> "pl.DataFrame":
+    return SHARED_FRAMES.derived(
+        other, ("polars keys", tuple(key_cols)), lambda: _polars_keys(other, key_cols).unique().collect()
+    )
+
+def _polars_first_match(df: pd.DataFrame, others, key_cols) -> np.ndarray:
+    key_cols = list(key_cols)
+    matched = _polars_keys(df, key_cols).with_row_index("_row").unique(subset=key_cols, keep="first")
+    for other in others:
+        # Missing key values match each other, as they do in the pandas engine
+        matched = matched.join(_polars_key_index(other, key_cols).lazy(), on=key_cols, how="semi", nulls_equal=True)
+    mask = np.zeros(len(df), dtype=bool)
+    mask[matched.select("_row").collect()["_row"].to_numpy()] = True
+    return mask
+
+# Engines by name: the function computing first_match_mask.
+ENGINES = {"pandas": _pandas_first_match}
+if pl is not None:
+    ENGINES["polars"] = _polars_first_match
+
+def reference_rows(df: pd.DataFrame, selected_countries, country_col: str = 'Country') -> pd.DataFrame:
+    """
+    Returns the rows of a reference frame for the selected countries. A shared
+    reference frame (see shared_frames.SHARED_FRAMES) is returned as it is, so
+    its key index is reused; it was loaded for the selected countries already,
+    and rows of other countries could not match anyway as Country is part of the key.
+    """
+    if SHARED_FRAMES.is_shared(df):
+        return df
+    return df[df[country_col].isin(selected_countries)]
+
+def first_match_mask(df: pd.DataFrame, *others: pd.DataFrame, key_cols=KEY_COLUMNS,
+                     engine: str = DEFAULT_ENGINE) -> np.ndarray:
+    """
+    Returns a mask selecting the first row of `df` per key whose key exists in
+    every one of `others`, like drop_duplicates(keep='first') followed by inner
+    merges against the deduplicated keys of `others`.
+
+    Args:
+        df: The frame to select rows from.
+        others: The reference frames the keys must exist in. The key index of a
+            shared reference frame is built once and reused.
+        key_cols: The columns that together identify a record.
+        engine: A key of ENGINES.
+
+    Raises:
+        ValueError: If the engine is not available.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Engine {engine!r} is not available; expected one of {list(ENGINES)}.")
+    return ENGINES[engine](df, others, key_cols)
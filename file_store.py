@@ -0,0 +1,48 @@
+import os
+import time
+
+import pandas as pd
+import pyarrow as pa
+
+def frame_to_parquet(df: pd.DataFrame, target, **kwargs) -> None:
+    """
+    Writes a pandas DataFrame as a Parquet file with pd.DataFrame.to_parquet.
+    Mixed-type text columns, which Arrow cannot store as they are, are stored
+    as strings.
+    """
+    try:
+        df.to_parquet(target, **kwargs)
+    except (pa.ArrowTypeError, pa.ArrowInvalid):
+        object_cols = df.select_dtypes(include='object').columns
+        df.astype({col: 'string' for col in object_cols}).to_parquet(target, **kwargs)
+
+def evict_files(directory: str, max_bytes: int, ttl_seconds: float | None = None, now: float | None = None):
+    """
+    Deletes the files of a directory by modification time, taken as their last
+    use: those older than the TTL, then the oldest until the rest fit `max_bytes`.
+    Files still being written (*.tmp) are left alone. Callers hold their own lock.
+    """
+    if not os.path.isdir(directory):
+        return
+    now = time.time() if now is None else now
+    files = []
+    for entry in os.scandir(directory):
+        if entry.name.endswith(".tmp"):
+            continue
+        try:
+            stat = entry.stat()
+        except FileNotFoundError:
+            continue
+        files.append((stat.st_mtime, stat.st_size, entry.path))
+    files.sort()
+
+    total = sum(size for _, size, _ in files)
+    for mtime, size, path in files:
+        expired = ttl_seconds is not None and now - mtime > ttl_seconds
+        if not expired and total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
@@ -0,0 +1,176 @@
+"""
+Lightweight per-stage timing and memory instrumentation.
+
+Pipelines mark their stages with `stage(...)`; the stages are recorded on the
+RunMetrics made current by `track_run(...)` and appended to a JSON lines log.
+Outside of a tracked run, `stage` only times the block and records nothing.
+"""
+import json
+import os
+import threading
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+
+import pandas as pd
+
+# Where stage records are appended as JSON lines; set to an empty string to disable.
+METRICS_LOG = os.environ.get(
+    "RF2HOS_METRICS_LOG", os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs", "metrics.jsonl")
+)
+
+# Traced peak memory needs tracemalloc, which slows pandas down noticeably,
+# so it is opt-in. Without it only the resident memory around each stage is recorded.
+TRACE_MEMORY = os.environ.get("RF2HOS_TRACE_MEMORY") == "1"
+
+_current_run = ContextVar("current_run", default=None)
+_current_checkpoint = ContextVar("current_checkpoint", default=None)
+_log_lock = threading.Lock()
+
+def rss_mb() -> float | None:
+    """Returns the current resident memory of this process in MB, or None where /proc is not available."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return round(pages * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2, 1)
+
+class _MemoryTracer:
+    """
+    Runs tracemalloc while any stage is traced. tracemalloc has one peak for the
+    whole process, so it is only reset when no other stage is being traced;
+    stages overlapping in other threads share their peak.
+    """
+
+    def __init__(self):
+        self._active = 0
+        self._started = False
+        self._lock = threading.Lock()
+
+    def enter(self):
+        with self._lock:
+            if self._active == 0:
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                    self._started = True
+                tracemalloc.reset_peak()
+            self._active += 1
+
+    def exit(self) -> float:
+        """Returns the traced peak since the first active stage started, in MB."""
+        with self._lock:
+            peak = tracemalloc.get_traced_memory()[1]
+            self._active -= 1
+            if self._active == 0 and self._started:
+                tracemalloc.stop()
+                self._started = False
+        return round(peak / 1024 ** 2, 1)
+
+_tracer = _MemoryTracer()
+
+class Stage:
+    """
+    One measured stage. Set `rows_out` inside the block to record the rows it produced.
+
+    Memory is measured for the whole process: `rss_start_mb` and `rss_end_mb` are
+    its resident memory as the stage starts and ends, and `peak_traced_mb` the
+    peak traced while it ran (with TRACE_MEMORY), which includes stages running
+    at the same time in other threads.
+    """
+
+    def __init__(self, name: str, rows_in: int | None = None):
+        self.name = name
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.seconds = None
+        self.rss_start_mb = None
+        self.rss_end_mb = None
+        self.peak_traced_mb = None
+
+    def as_dict(self) -> dict:
+        return {
+            "stage": self.name, "seconds": self.seconds, "rows_in": self.rows_in, "rows_out": self.rows_out,
+            "rss_start_mb": self.rss_start_mb, "rss_end_mb": self.rss_end_mb, "peak_traced_mb": self.peak_traced_mb,
+        }
+
+class RunMetrics:
+    """
+    The stages recorded for one run of a module. A stage that runs again under the
+    same name (e.g. the export on a later rerun) replaces the earlier record.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.run_id = uuid.uuid4().hex[:12]
+        self.stages = {}
+
+    def record(self, stage: Stage):
+        self.stages[stage.name] = stage
+        _append_log({
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            "run": self.name, "run_id": self.run_id, **stage.as_dict(),
+        })
+
+    def to_frame(self) -> pd.DataFrame:
+        """Returns the stages as a table, in the order they first ran."""
+        return pd.DataFrame(
+            [stage.as_dict() for stage in self.stages.values()],
+            columns=["stage", "seconds", "rows_in", "rows_out", "rss_start_mb", "rss_end_mb", "peak_traced_mb"],
+        )
+
+def _append_log(record: dict):
+    if not METRICS_LOG:
+        return
+    with _log_lock:
+        os.makedirs(os.path.dirname(METRICS_LOG) or ".", exist_ok=True)
+        with open(METRICS_LOG, "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+@contextmanager
+def track_run(metrics, checkpoint=None):
+    """
+    Makes `metrics` (a RunMetrics, or a name to create one) the target of the
+    stages run inside the block, in this thread.
+
+    Args:
+        metrics: The run to record the stages on.
+        checkpoint: A function called as each stage starts, e.g. one that stops
+            a cancelled job by raising.
+    """
+    if isinstance(metrics, str):
+        metrics = RunMetrics(metrics)
+    token = _current_run.set(metrics)
+    checkpoint_token = _current_checkpoint.set(checkpoint)
+    try:
+        yield metrics
+    finally:
+        _current_checkpoint.reset(checkpoint_token)
+        _current_run.reset(token)
+
+@contextmanager
+def stage(name: str, rows_in: int | None = None):
+    """
+    Measures the wall time and memory of the block as one stage of the current run.
+    """
+    checkpoint = _current_checkpoint.get()
+    if checkpoint is not None:
+        checkpoint()
+    record = Stage(name, rows_in)
+    record.rss_start_mb = rss_mb()
+    if TRACE_MEMORY:
+        _tracer.enter()
+    started = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record.seconds = round(time.perf_counter() - started, 4)
+        if TRACE_MEMORY:
+            record.peak_traced_mb = _tracer.exit()
+        record.rss_end_mb = rss_mb()
+        metrics = _current_run.get()
+        if metrics is not None:
+            metrics.record(record)
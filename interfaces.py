@@ -0,0 +1,137 @@
+"""
+The interfaces that validate or split RF extracts, declared as data.
+
+Each InterfaceSpec names its inputs, the reference files its records must be
+found in, the codes it drops and the rows it takes over from other files.
+pipeline.py runs the specs, modules/interface_page.py renders a page for each
+of them, and batch.py runs them headless. I01 compares values rather than keys
+and stays a module of its own (modules/i01.py).
+"""
+from dataclasses import dataclass, field
+
+from utils import KEY_COLUMNS
+
+@dataclass(frozen=True)
+class InputSpec:
+    """
+    One input file of an interface.
+
+    Attributes:
+        schema: The schema key of the file, e.g. "I37".
+        label: The label of its upload widget.
+    """
+    schema: str
+    label: str
+
+@dataclass(frozen=True)
+class AppendSpec:
+    """
+    Rows taken over from another input and appended to the primary rows, e.g.
+    the RF51 option records that become I52 lines.
+
+    Attributes:
+        schema: The schema key of the input the rows come from.
+        codes: The codes of the rows taken over.
+        columns: The columns carried over unchanged.
+        constants: Columns set to a fixed value on the appended rows.
+    """
+    schema: str
+    codes: tuple[str, ...]
+    columns: tuple[str, ...]
+    constants: dict[str, str] = field(default_factory=dict)
+
+@dataclass(frozen=True)
+class InterfaceSpec:
+    """
+    Describes one interface. The first input is the RF extract whose rows are
+    output, split into one file per country.
+
+    Attributes:
+        name: The interface name, e.g. "I38"; also the prefix of its output files.
+        title: The page header.
+        inputs: The input files, the primary RF extract first.
+        match: Schema keys of the reference inputs every output key must exist
+            in. With none, the rows are only filtered and split.
+        exclude_codes: Codes whose primary rows are dropped.
+        append: Rows taken over from another input, if any.
+        key_cols: The columns that together identify a record.
+        code_col: The column holding the codes of exclude_codes and append.
+    """
+    name: str
+    title: str
+    inputs: tuple[InputSpec, ...]
+    match: tuple[str, ...] = ()
+    exclude_codes: tuple[str, ...] = ()
+    append: AppendSpec | None = None
+    key_cols: tuple[str, ...] = KEY_COLUMNS
+    code_col: str = 'Attribute Value Code'
+
+    @property
+    def schemas(self) -> tuple[str, ...]:
+        """The schema keys of the inputs, in order."""
+        return tuple(spec.schema for spec in self.inputs)
+
+    @property
+    def primary(self) -> str:
+        return self.inputs[0].schema
+
+    @property
+    def key(self) -> str:
+        """The prefix of the interface's widget and session state keys, e.g. "i38"."""
+        return self.name.lower()
+
+    def input_columns(self, schema: str) -> tuple[str, ...] | None:
+        """
+        Returns the columns the interface reads from an input, or None if it
+        reads every column. Reference inputs only supply keys to match.
+        """
+        if schema == self.primary:
+            return None
+        if schema in self.match:
+            return self.key_cols
+        if self.append is not None and schema == self.append.schema:
+            return tuple(dict.fromkeys((*self.key_cols, self.code_col, *self.append.columns)))
+        return None
+
+# Option codes that RF51 carries but I51 must not: they are dropped from I51 and
+# converted into I52 lines instead.
+RF51_OS_CODES = ("HEL_15T_IN", "HEL_30T_IN", "HEL_ING_IN", "EASYSWITCH_IN", "UQCM_IN")
+
+# RF51 columns carried over unchanged when converting OS records into I52 lines
+RF51_TO_I52_COLUMNS = (
+    'Country', 'Attribute Value Code', 'Attribute Value Description',
+    'Attribute Value FP', 'Attribute Value TP', 'Attribute Value LP',
+    'Attribute Value MMFP', 'Attribute Value MMTP', 'Attribute Value MMLP',
+    'Attribute Deactivated YN', 'Customer Bank Value', 'RSM Type', 'RSM Consumption',
+    'Currency', 'Local FP', 'Price Book Name', 'Server', 'Changed On', 'Changed By',
+)
+RF51_TO_I52_CONSTANTS = {'Display Group Code': 'LI', 'Attribute Value Price Type': 'Lookup'}
+
+INTERFACE_SPECS = {spec.name: spec for spec in (
+    InterfaceSpec(
+        "I34", "I34: Split by Country",
+        inputs=(InputSpec("I34", "Upload I34 RF CSV File"),),
+    ),
+    InterfaceSpec(
+        "I38", "I38: Validate Records (I38/I37)",
+        inputs=(InputSpec("I38", "Upload I38 RF"), InputSpec("I38_HOS", "Upload I38 HOS"), InputSpec("I37", "Upload I37 HOS")),
+        match=("I38_HOS", "I37"),
+    ),
+    InterfaceSpec(
+        "I51", "I51: Validate Records (I51/I37)",
+        inputs=(InputSpec("I51", "Upload I51 RF"), InputSpec("I37", "Upload I37 HOS")),
+        match=("I37",),
+        exclude_codes=RF51_OS_CODES,
+    ),
+    InterfaceSpec(
+        "I52", "I52: Transform and Validate (I52/I51/I36)",
+        inputs=(InputSpec("I52", "Upload I52 RF"), InputSpec("I51", "Upload I51 RF"), InputSpec("I36", "Upload I36 HOS")),
+        match=("I36",),
+        append=AppendSpec("I51", RF51_OS_CODES, RF51_TO_I52_COLUMNS, RF51_TO_I52_CONSTANTS),
+    ),
+    InterfaceSpec(
+        "I53", "I53: Validate Records (I53/I35)",
+        inputs=(InputSpec("I53", "Upload I53 RF"), InputSpec("I35", "Upload I35 HOS")),
+        match=("I35",),
+    ),
+)}
@@ -0,0 +1,185 @@
+"""
+Runs module processing and exports on a worker pool instead of the Streamlit
+script thread.
+
+Jobs are owned by a browser session id that survives reloads (see
+modules.components.session_id), so a reconnecting session finds its running or
+finished jobs again. Long-running code reports progress and honours
+cancellation by calling `report_progress` or `checkpoint`; outside of a job
+both do nothing. Entering an instrumentation stage is a checkpoint as well.
+"""
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+
+from instrumentation import RunMetrics, track_run
+from result_store import RESULT_STORE, ResultHandle
+
+# Jobs running at once across all sessions; further jobs wait in the queue.
+JOB_WORKERS = int(os.environ.get("RF2HOS_JOB_WORKERS", "4"))
+
+# Finished jobs are forgotten after this long.
+JOB_TTL_SECONDS = 8 * 60 * 60
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+
+_current_job = ContextVar("current_job", default=None)
+
+class JobCancelled(Exception):
+    """Raised inside a job when it has been cancelled."""
+
+class Job:
+    """
+    One background run. `status` moves from queued to running to done, failed
+    or cancelled; `result` or `error` is set once it has finished. The stages the
+    job runs are recorded on `metrics`, so they double as its progress.
+    """
+
+    def __init__(self, owner: str, name: str, metrics: RunMetrics | None = None):
+        self.id = uuid.uuid4().hex[:12]
+        self.owner = owner
+        self.name = name
+        self.status = QUEUED
+        self.result = None
+        self.error = None
+        self.progress = None
+        self.started = time.time()
+        self.finished = None
+        self.metrics = metrics or RunMetrics(name)
+        self._cancel = threading.Event()
+
+    @property
+    def completed(self) -> list[str]:
+        """The names of the stages finished so far."""
+        return list(self.metrics.stages)
+
+    @property
+    def done(self) -> bool:
+        return self.status in (DONE, FAILED, CANCELLED)
+
+    def cancel(self):
+        """Asks the job to stop at its next checkpoint."""
+        self._cancel.set()
+
+    def checkpoint(self):
+        """
+        Raises:
+            JobCancelled: If the job has been cancelled.
+        """
+        if self._cancel.is_set():
+            raise JobCancelled(f"{self.name} was cancelled.")
+
+    def report(self, label: str, done: int | None = None, total: int | None = None):
+        self.checkpoint()
+        self.progress = (label, done, total)
+
+    def _run(self, func, args, kwargs):
+        if self._cancel.is_set():
+            self.status, self.finished = CANCELLED, time.time()
+            return
+        self.status = RUNNING
+        token = _current_job.set(self)
+        try:
+            # Every stage the job enters is a checkpoint too
+            with track_run(self.metrics, checkpoint=self.checkpoint):
+                result = func(*args, **kwargs)
+            if self._cancel.is_set():
+                # Cancelled after its last checkpoint: nobody will read the result
+                _discard(result)
+                raise JobCancelled(f"{self.name} was cancelled.")
+            self.result = result
+            self.status = DONE
+        except JobCancelled:
+            self.status = CANCELLED
+        except Exception as e:
+            self.error = e
+            self.status = FAILED
+        finally:
+            _current_job.reset(token)
+            self.finished = time.time()
+
+def _discard(result):
+    # A job's result is a dict of session state values; stored frames among
+    # them would otherwise stay on disk until the result store's TTL
+    if isinstance(result, dict):
+        for value in result.values():
+            if isinstance(value, ResultHandle):
+                RESULT_STORE.delete(value)
+
+def report_progress(label: str, done: int | None = None, total: int | None = None):
+    """
+    Reports the progress of the job running in this thread, if any.
+
+    Raises:
+        JobCancelled: If the job has been cancelled.
+    """
+    job = _current_job.get()
+    if job is not None:
+        job.report(label, done, total)
+
+def checkpoint():
+    """
+    Stops the job running in this thread if it has been cancelled.
+
+    Raises:
+        JobCancelled: If the job has been cancelled.
+    """
+    job = _current_job.get()
+    if job is not None:
+        job.checkpoint()
+
+class JobManager:
+    """
+    Runs jobs on a thread pool and keeps the latest job per owner and name.
+    """
+
+    def __init__(self, max_workers: int = JOB_WORKERS, ttl_seconds: float = JOB_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, owner: str, name: str, func, *args, metrics: RunMetrics | None = None, **kwargs) -> Job:
+        """
+        Queues `func(*args, **kwargs)` as the owner's job `name`, cancelling the
+        job it replaces if that is still running.
+
+        Args:
+            owner: The session id the job belongs to.
+            name: The job's name, e.g. "I38" or "I38 export".
+            func: The function to run.
+            metrics: The run the job's stages are recorded on; a new one by default.
+        """
+        job = Job(owner, name, metrics)
+        with self._lock:
+            self._prune()
+            previous = self._jobs.get((owner, name))
+            if previous is not None and not previous.done:
+                previous.cancel()
+            self._jobs[(owner, name)] = job
+        self._executor.submit(job._run, func, args, kwargs)
+        return job
+
+    def get(self, owner: str, name: str) -> Job | None:
+        """Returns the owner's latest job `name`, running or finished."""
+        with self._lock:
+            return self._jobs.get((owner, name))
+
+    def forget(self, owner: str, name: str):
+        """Cancels and drops the owner's job `name`."""
+        with self._lock:
+            job = self._jobs.pop((owner, name), None)
+        if job is not None:
+            job.cancel()
+
+    def _prune(self):
+        now = time.time()
+        for key, job in list(self._jobs.items()):
+            if job.done and now - job.finished > self.ttl_seconds:
+                del self._jobs[key]
+
+# Shared by every session of the app process.
+JOBS = JobManager()
@@ -0,0 +1,330 @@
+import os
+import uuid
+
+import pandas as pd
+import streamlit as st
+from functools import partial
+from instrumentation import stage
+from jobs import CANCELLED, DONE, FAILED, JOBS, checkpoint
+from output_cache import OUTPUT_CACHE
+from parse_cache import file_digest, read_csv_cached
+from reference_store import REFERENCE_FILES, Snapshot, list_quarters, load_snapshot, snapshot_path
+from result_store import RESULT_STORE, ResultHandle
+from schemas import SCHEMAS, SchemaError
+from shared_frames import SHARED_FRAMES
+from utils import CSV_UPLOAD_TYPES, DEFAULT_EXPORT_FORMAT, read_archive, read_csv_filtered, to_zip_file
+
+UPLOAD_OPTION = "Upload CSV"
+
+RESULTS_EXPIRED_MESSAGE = "These results have expired. Please process the files again."
+
+PREVIEW_PAGE_SIZES = (50, 100, 500, 1000)
+
+def reference_file_input(label, name, key):
+    """
+    Renders an input for a HOS reference file. When snapshots of the file are
+    stored, the user can pick one instead of uploading the CSV.
+
+    Returns:
+        The uploaded file, a Snapshot, or None if nothing was provided yet.
+    """
+    quarters = list_quarters(name)
+    if quarters:
+        source = st.selectbox(label, [f"Snapshot {q}" for q in quarters] + [UPLOAD_OPTION], key=f"{key}_source")
+        if source != UPLOAD_OPTION:
+            return Snapshot(name, source.removeprefix("Snapshot "))
+        return st.file_uploader(label, type=CSV_UPLOAD_TYPES, key=key, label_visibility="collapsed")
+    return st.file_uploader(label, type=CSV_UPLOAD_TYPES, key=key)
+
+def read_input(source, name, selected_countries, columns=None):
+    """
+    Loads the rows for the selected countries from an upload or a stored snapshot,
+    using the dtypes of the schema `name`. Uploads are checked for the required
+    columns before parsing, and lines above their header row are skipped.
+
+    HOS reference files are loaded through SHARED_FRAMES, so every session
+    reading the same content for the same countries gets the same read-only frame.
+    Other uploads go through the parse cache; reference uploads bypass it, so
+    only SHARED_FRAMES holds them.
+
+    Args:
+        columns: The columns to parse (see InterfaceSpec.input_columns), or
+            None for all of them.
+
+    Raises:
+        SchemaError: If an upload has no header row with the required columns.
+    """
+    schema = SCHEMAS[name] if columns is None else SCHEMAS[name].select(columns)
+    countries = tuple(sorted(set(selected_countries)))
+    columns = tuple(columns) if columns is not None else None
+    checkpoint()
+    with stage(f"parse {schema.name}") as s:
+        if isinstance(source, Snapshot):
+            load = partial(load_snapshot, source, selected_countries, columns=columns)
+            path = snapshot_path(*source)
+            key = (name, path, os.path.getmtime(path), countries, columns)
+        else:
+            header_row = schema.header_row(source)
+            read_kwargs = {'skiprows': header_row} if header_row else {}
+            if columns is not None:
+                read_kwargs['usecols'] = columns
+            digest = file_digest(source)
+            if name in REFERENCE_FILES:
+                load = partial(read_csv_filtered, source, selected_countries, dtype=schema.dtypes, **read_kwargs)
+            else:
+                load = partial(read_csv_cached, source, selected_countries, dtype=schema.dtypes, digest=digest, **read_kwargs)
+            key = (name, digest, header_row, countries, columns)
+        df = SHARED_FRAMES.get(key, load) if name in REFERENCE_FILES else load()
+        s.rows_out = len(df)
+    return df
+
+def validate_inputs(inputs, columns=None):
+    """
+    Checks that each parsed input has the required columns of its schema.
+
+    Args:
+        inputs: (schema key, DataFrame) pairs.
+        columns: The columns each input was read with, by schema key (see
+            InterfaceSpec.input_columns); only those are required of it. None
+            or a missing key means every column.
+
+    Raises:
+        SchemaError: For the first input that lacks required columns.
+    """
+    columns = columns or {}
+    for name, df in inputs:
+        schema = SCHEMAS[name] if columns.get(name) is None else SCHEMAS[name].select(columns[name])
+        if schema.missing_columns(df.columns):
+            raise SchemaError(
+                f"**Error in {schema.name} file!** It's missing one or more essential columns.\n\n"
+                f"**Required columns:** `{list(schema.required)}`\n\n"
+                f"**Actual columns found:** `{df.columns.tolist()}`\n\n"
+                "Please check the CSV file for extra rows above the header or formatting issues."
+            )
+
+def session_id():
+    """
+    Returns an id for this browser session that survives page reloads, so a
+    reconnecting session finds its jobs again. It is kept in the page URL, so
+    anyone opening a copied URL sees the same jobs; see clear_results for what
+    such a session may remove.
+    """
+    if "session" not in st.query_params:
+        st.query_params["session"] = uuid.uuid4().hex
+    return st.query_params["session"]
+
+def start_job(name, func, *args, **kwargs):
+    """
+    Runs `func` as this session's background job `name` (see jobs.JobManager.submit).
+    The job is recorded as started by this Streamlit session, which owns its results.
+    """
+    job = JOBS.submit(session_id(), name, func, *args, **kwargs)
+    st.session_state.setdefault("started_jobs", set()).add(job.id)
+    return job
+
+def _owns(job) -> bool:
+    return job.id in st.session_state.get("started_jobs", ())
+
+@st.fragment(run_every=1)
+def _job_progress(job, key):
+    if job.done:
+        st.rerun()
+    label, done, total = job.progress or (None, None, None)
+    if total:
+        st.progress(done / total, text=f"{job.name}: {label} {done}/{total}")
+    else:
+        st.progress(0.0, text=f"{job.name}: {job.status}...")
+    if job.completed:
+        st.caption("Completed: " + ", ".join(job.completed))
+    if st.button("Cancel", key=f"{key}_cancel"):
+        job.cancel()
+
+def show_job_error(job):
+    if job.status == FAILED:
+        if isinstance(job.error, SchemaError):
+            st.error(str(job.error))
+        else:
+            st.error(f"An unexpected error occurred: {job.error}")
+    elif job.status == CANCELLED:
+        st.info(f"{job.name} was cancelled.")
+
+def job_status(name, key):
+    """
+    Shows this session's job `name`: its progress and a Cancel button while it
+    runs, its error if it failed. A finished job's result, a dict of session
+    state values, replaces the module's previous result once; its stages are
+    stored under "<key>_metrics" and "<key>_processed" is set.
+
+    Args:
+        name: The job name, e.g. "I38".
+        key: The module's key prefix, e.g. "i38".
+    """
+    job = JOBS.get(session_id(), name)
+    if job is None:
+        return
+    if not job.done:
+        _job_progress(job, key)
+        return
+    show_job_error(job)
+    if job.status == DONE and st.session_state.get(f"{key}_job") != job.id:
+        st.session_state[f"{key}_job"] = job.id
+        clear_results(list(job.result) + [f"{key}_archive"])
+        if _owns(job):
+            st.session_state.setdefault("owned_results", set()).update(
+                value.result_id for value in job.result.values() if isinstance(value, ResultHandle)
+            )
+        st.session_state.update(job.result)
+        st.session_state[f"{key}_processed"] = True
+        st.session_state[f"{key}_metrics"] = job.metrics
+
+def _build_archive(archive_id, build_files, options):
+    files = build_files()
+    return archive_id, to_zip_file(files, **options) if files else None
+
+def clear_results(keys, job=None):
+    """
+    Removes a module's results from the session and deletes their stored frames.
+    With `job`, the session's job of that name is forgotten too, so a reloaded
+    page does not bring the results back.
+
+    Only jobs and frames this Streamlit session created are forgotten or deleted.
+    Another session attached through a copied URL, or this one after a page
+    reload, just drops them from its own state; their frames expire with the
+    result store's TTL.
+    """
+    if job is not None:
+        current = JOBS.get(session_id(), job)
+        if current is not None and _owns(current):
+            JOBS.forget(session_id(), job)
+    owned = st.session_state.get("owned_results", set())
+    for key in keys:
+        value = st.session_state.pop(key, None)
+        if isinstance(value, ResultHandle) and value.result_id in owned:
+            owned.discard(value.result_id)
+            RESULT_STORE.delete(value)
+
+def export_options():
+    """
+    Returns the to_zip_file options chosen on the settings page.
+    """
+    return {
+        'fmt': st.session_state.get('export_format', DEFAULT_EXPORT_FORMAT),
+        'cache': OUTPUT_CACHE if st.session_state.get('incremental_export', False) else None,
+    }
+
+def archive_download(handles, build_files, file_name, key):
+    """
+    Renders a button that builds the download archive in a background job and,
+    once built, the download button. The archive is kept in session state for
+    the result and export options it was built with, so reruns reuse it instead
+    of exporting again; changing the export options asks for a new build.
+
+    Args:
+        handles: The ResultHandles the archive is built from.
+        build_files: Called without arguments to get the files to zip.
+        file_name: The download name, e.g. "I38_Output.zip".
+        key: The module's key prefix, e.g. "i38"; the archive is stored under "<key>_archive"
+            and the export stages are added to "<key>_metrics".
+    """
+    options = export_options()
+    archive_id = (tuple(handle.result_id for handle in handles), options['fmt'], options['cache'] is not None)
+    archive = st.session_state.get(f"{key}_archive")
+    if archive is None or archive[0] != archive_id:
+        job_name = f"{key.upper()} export"
+        job = JOBS.get(session_id(), job_name)
+        if job is not None and job.result is not None and job.result[0] == archive_id:
+            archive = st.session_state[f"{key}_archive"] = job.result
+        else:
+            if job is not None and job.done:
+                show_job_error(job)
+            if job is None or job.done:
+                if not st.button("Prepare Download", key=f"{key}_prepare"):
+                    return
+                job = start_job(job_name, _build_archive, archive_id, build_files, options,
+                                metrics=st.session_state.get(f"{key}_metrics"))
+            _job_progress(job, f"{key}_export")
+            return
+
+    if archive[1] is None:
+        st.info("There are no files to download.")
+        return
+    st.download_button("Download All Files as .zip", partial(read_archive, archive[1]), file_name, "application/zip", key=f"{key}_zip_dl")
+
+def filter_frame(df, countries=(), code_search=""):
+    """
+    Returns the rows of `df` in the given countries whose Attribute Value Code
+    contains `code_search` (case-insensitive). Empty filters match every row.
+    """
+    mask = pd.Series(True, index=df.index)
+    if countries:
+        mask &= df["Country"].isin(countries)
+    if code_search:
+        codes = df["Attribute Value Code"]
+        if isinstance(codes.dtype, pd.CategoricalDtype):
+            # Search the distinct codes once instead of every row
+            categories = codes.cat.categories
+            matches = categories[categories.astype(str).str.contains(code_search, case=False, regex=False)]
+            mask &= codes.isin(matches)
+        else:
+            mask &= codes.astype(str).str.contains(code_search, case=False, regex=False)
+    return df[mask]
+
+def column_summary(df):
+    """
+    Returns one row per column of `df`: its dtype, non-empty and distinct values,
+    and the range of numeric columns.
+    """
+    rows = []
+    for col in df.columns:
+        values = df[col]
+        numeric = pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values)
+        rows.append({
+            "Column": col,
+            "Type": str(values.dtype),
+            "Non-empty": int(values.notna().sum()),
+            "Distinct": int(values.nunique()),
+            "Min": float(values.min()) if numeric and values.notna().any() else None,
+            "Max": float(values.max()) if numeric and values.notna().any() else None,
+        })
+    return pd.DataFrame(rows, columns=["Column", "Type", "Non-empty", "Distinct", "Min", "Max"])
+
+def result_preview(df, key):
+    """
+    Renders a result as per-country row counts, column summaries and one page of
+    rows, filtered on Country and Attribute Value Code where the result has them.
+    Pagination happens on the server, so only the visible page is sent to the browser.
+
+    Args:
+        df: The result to preview.
+        key: The module's key prefix, e.g. "i38".
+    """
+    countries, code_search = [], ""
+    col1, col2 = st.columns(2)
+    if "Country" in df.columns:
+        with col1:
+            options = df["Country"].drop_duplicates().dropna().sort_values().tolist()
+            countries = st.multiselect("Filter countries:", options, key=f"{key}_preview_countries")
+    if "Attribute Value Code" in df.columns:
+        with col2:
+            code_search = st.text_input("Search Attribute Value Code:", key=f"{key}_preview_search").strip()
+    view = filter_frame(df, countries, code_search)
+
+    if "Country" in df.columns:
+        with st.expander("Rows per country"):
+            counts = view.groupby("Country", observed=True).size().rename("Rows").reset_index()
+            st.dataframe(counts, hide_index=True)
+    with st.expander("Column summary"):
+        st.dataframe(column_summary(view), hide_index=True)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        page_size = st.selectbox("Rows per page:", PREVIEW_PAGE_SIZES, key=f"{key}_preview_page_size")
+    n_pages = max(1, -(-len(view) // page_size))
+    with col2:
+        # The stored page may be past the end after the filters narrow the rows
+        page = min(int(st.number_input(f"Page (of {n_pages}):", min_value=1, step=1, key=f"{key}_preview_page")), n_pages)
+
+    start = (page - 1) * page_size
+    st.dataframe(view.iloc[start:start + page_size])
+    shown = f"rows {start + 1:,}–{min(start + page_size, len(view)):,} of {len(view):,}" if len(view) else "no rows"
+    st.caption(f"Showing {shown}" + (f" (filtered from {len(df):,})" if len(view) != len(df) else ""))
@@ -1,4 +1,20 @@
 import streamlit as st
+from engines import DEFAULT_ENGINE, ENGINES
+from reference_store import REFERENCE_FILES, import_snapshot, list_quarters
+from schemas import SCHEMAS
+from utils import CSV_UPLOAD_TYPES, DEFAULT_EXPORT_FORMAT, EXPORT_FORMATS, EXPORT_MANIFEST_NAME
+
+ENGINE_LABELS = {
+    'pandas': "pandas (single-threaded)",
+    'polars': "polars (multi-threaded)",
+}
+
+EXPORT_FORMAT_LABELS = {
+    'xlsx': "Excel (HOS delivery layout)",
+    'xlsx_fast': "Excel, fast write-only (dry runs)",
+    'csv': "CSV",
+    'parquet': "Parquet",
+}
 
 def render():
     """
@@ -40,4 +56,68 @@ def render():
     if st.session_state.get('selected_countries'):
         st.info(f"Current selection applied: **{', '.join(st.session_state['selected_countries'])}**")
     else:
-        st.warning("No countries selected. Please make a selection to enable the other modules.")
\ No newline at end of file
+        st.warning("No countries selected. Please make a selection to enable the other modules.")
+
+    st.markdown("---")
+
+    # The export format applies to the download archives of all modules.
+    st.subheader("Export Format")
+    formats = list(EXPORT_FORMATS.keys())
+    current_format = st.session_state.get('export_format', DEFAULT_EXPORT_FORMAT)
+    st.session_state['export_format'] = st.selectbox(
+        "Write output files as:",
+        options=formats,
+        index=formats.index(current_format),
+        format_func=EXPORT_FORMAT_LABELS.get,
+    )
+    if st.session_state['export_format'] != DEFAULT_EXPORT_FORMAT:
+        st.caption("Use the default Excel format for the final HOS delivery.")
+
+    # Country files whose content did not change since an earlier run are
+    # taken from the output cache instead of being rendered again.
+    st.session_state['incremental_export'] = st.checkbox(
+        "Incremental export (reuse unchanged country files)",
+        value=st.session_state.get('incremental_export', False),
+    )
+    if st.session_state['incremental_export']:
+        st.caption(f"Archives include a {EXPORT_MANIFEST_NAME} listing the rebuilt and reused files.")
+
+    # The engine the validation modules match keys with; polars is listed only when installed.
+    st.subheader("Processing Engine")
+    engines = list(ENGINES.keys())
+    current_engine = st.session_state.get('engine', DEFAULT_ENGINE)
+    st.session_state['engine'] = st.selectbox(
+        "Match records with:",
+        options=engines,
+        index=engines.index(current_engine) if current_engine in engines else 0,
+        format_func=ENGINE_LABELS.get,
+    )
+
+    st.markdown("---")
+
+    # HOS reference files change once a quarter; importing them here lets the
+    # modules load a stored snapshot instead of a new upload.
+    st.subheader("HOS Reference Snapshots")
+    col1, col2 = st.columns(2)
+    with col1:
+        name = st.selectbox(
+            "Reference file:", options=list(REFERENCE_FILES),
+            format_func=lambda key: SCHEMAS[key].name, key="home_snapshot_name"
+        )
+    with col2:
+        quarter = st.text_input("Quarter (e.g. 2026Q4):", key="home_snapshot_quarter")
+    snapshot_file = st.file_uploader("Upload reference CSV", type=CSV_UPLOAD_TYPES, key="home_snapshot_file")
+
+    if snapshot_file and quarter and st.button("Import Snapshot", key="home_snapshot_import"):
+        with st.spinner("Importing..."):
+            try:
+                import_snapshot(snapshot_file, name, quarter.strip().upper())
+                st.success(f"Stored {SCHEMAS[name].name} snapshot for {quarter.strip().upper()}.")
+            except ValueError as e:
+                st.error(f"**Could not import snapshot:** {e}")
+
+    stored = {SCHEMAS[key].name: ", ".join(list_quarters(key)) for key in REFERENCE_FILES if list_quarters(key)}
+    if stored:
+        st.table({"File": list(stored.keys()), "Quarters": list(stored.values())})
+    else:
+        st.caption("No snapshots stored yet.")
\ No newline at end of file
@@ -1,27 +1,97 @@
 import streamlit as st
 import pandas as pd
-from utils import to_zip
+from functools import partial
+from utils import CSV_UPLOAD_TYPES, partition_by_country
+from modules.components import (
+    RESULTS_EXPIRED_MESSAGE, archive_download, clear_results, job_status,
+    read_input, reference_file_input, result_preview, start_job, validate_inputs,
+)
+from instrumentation import stage
+from result_store import RESULT_STORE
 
-def process_data(rf01_df, hos01_df, selected_countries):
-    countries_rf01_df = rf01_df[rf01_df["Country"].isin(selected_countries)].copy()
-    countries_hos01_df = hos01_df[hos01_df["Country"].isin(selected_countries)].copy()
+COLUMNS_TO_COMPARE = ["h_cost_rate", "h_trav_CM", "h_trav_PM", "mat_hand", "LaborGM", "PartsGM", "TP_LP_UP", "FP_LP_UP", "NBV_LAT", "NBV_NPC", "NBV_UPLIFT"]
 
-    merged_df = pd.merge(countries_hos01_df, countries_rf01_df, on="Country", suffixes=('_hos', '_rf'), how='inner')
-    
-    columns_to_compare = ["h_cost_rate", "h_trav_CM", "h_trav_PM", "mat_hand", "LaborGM", "PartsGM", "TP_LP_UP", "FP_LP_UP", "NBV_LAT", "NBV_NPC", "NBV_UPLIFT"]
-    changes_list = []
+def diff_frames(old_df, new_df, columns_to_compare, key_cols=("Country",), tolerances=None):
+    """
+    Compares two frames row by row on the key columns and lists every changed value.
 
+    Rows are paired by their key and by their position within that key, so a key
+    that appears several times is matched one-to-one instead of as a cross join.
+    Two missing values count as equal, and columns listed in `tolerances` treat
+    numeric differences up to the given amount as equal.
+
+    Returns:
+        pd.DataFrame: One row per change with the key columns, 'Column',
+        'Old Value' and 'New Value'.
+    """
+    key_cols = list(key_cols)
+    tolerances = tolerances or {}
+    result_cols = key_cols + ['Column', 'Old Value', 'New Value']
+
+    old_df = old_df.assign(_occurrence=old_df.groupby(key_cols, sort=False, dropna=False).cumcount())
+    new_df = new_df.assign(_occurrence=new_df.groupby(key_cols, sort=False, dropna=False).cumcount())
+    merged_df = pd.merge(old_df, new_df, on=key_cols + ['_occurrence'], suffixes=('_hos', '_rf'), how='inner')
+
+    changes = []
     for column in columns_to_compare:
         col_hos = f"{column}_hos"
         col_rf = f"{column}_rf"
-        if col_hos in merged_df.columns and col_rf in merged_df.columns:
-            differences = merged_df[merged_df[col_hos] != merged_df[col_rf]]
-            for _, row in differences.iterrows():
-                changes_list.append({'Country': row['Country'], 'Column': column, 'Old Value': row[col_hos], 'New Value': row[col_rf]})
-    
-    changed_values_df = pd.DataFrame(changes_list)
+        if col_hos not in merged_df.columns or col_rf not in merged_df.columns:
+            continue
+        old_values = merged_df[col_hos]
+        new_values = merged_df[col_rf]
+        equal = (old_values == new_values).fillna(False) | (old_values.isna() & new_values.isna())
+        if column in tolerances:
+            delta = (pd.to_numeric(old_values, errors='coerce') - pd.to_numeric(new_values, errors='coerce')).abs()
+            equal |= delta <= tolerances[column]
+        differences = merged_df.loc[~equal, key_cols]
+        if differences.empty:
+            continue
+        changes.append(differences.assign(**{
+            'Column': column,
+            'Old Value': old_values[~equal],
+            'New Value': new_values[~equal],
+        }))
+
+    if not changes:
+        return pd.DataFrame(columns=result_cols)
+    return pd.concat(changes, ignore_index=True)[result_cols]
+
+def process_data(rf01_df, hos01_df, selected_countries, key_cols=("Country",), tolerances=None):
+    with stage("filter countries", rows_in=len(rf01_df)) as s:
+        countries_rf01_df = rf01_df[rf01_df["Country"].isin(selected_countries)].copy()
+        countries_hos01_df = hos01_df[hos01_df["Country"].isin(selected_countries)].copy()
+        s.rows_out = len(countries_rf01_df)
+
+    with stage("diff", rows_in=len(countries_rf01_df)) as s:
+        changed_values_df = diff_frames(countries_hos01_df, countries_rf01_df, COLUMNS_TO_COMPARE, key_cols, tolerances)
+        s.rows_out = len(changed_values_df)
     return changed_values_df, countries_rf01_df
 
+def export_files(changed_df, rf_df_filtered):
+    """
+    Returns the I01 export files: the list of changes, if any, and one file per country.
+    """
+    files = {}
+    if not changed_df.empty:
+        files["I01_changes.xlsx"] = changed_df
+    files.update(partition_by_country(rf_df_filtered, "I01"))
+    return files
+
+def run(rf01_file, hos01_file, selected_countries):
+    """
+    Reads and validates the inputs, processes them and stores the result.
+    Runs as a background job; returns the result's session state values.
+
+    Raises:
+        SchemaError: If an input lacks required columns.
+    """
+    rf01_df = read_input(rf01_file, "RF01", selected_countries)
+    hos01_df = read_input(hos01_file, "HOS01", selected_countries)
+    validate_inputs([("RF01", rf01_df), ("HOS01", hos01_df)])
+    changed_df, rf_df_filtered = process_data(rf01_df, hos01_df, selected_countries)
+    return {'i01_changed_df': RESULT_STORE.put(changed_df), 'i01_rf_df_filtered': RESULT_STORE.put(rf_df_filtered)}
+
 def render():
     st.header("I01: Country Master Data Comparison")
 
@@ -34,66 +104,40 @@ def render():
 
     col1, col2 = st.columns(2)
     with col1:
-        rf01_file = st.file_uploader("Upload RF01 CSV File", type="csv", key="i01_rf")
+        rf01_file = st.file_uploader("Upload RF01 CSV File", type=CSV_UPLOAD_TYPES, key="i01_rf")
     with col2:
-        hos01_file = st.file_uploader("Upload HOS01 CSV File", type="csv", key="i01_hos")
+        hos01_file = reference_file_input("Upload HOS01 CSV File", "HOS01", key="i01_hos")
 
     if rf01_file and hos01_file:
         if st.button("Process Files", key="i01_process"):
-            with st.spinner("Processing..."):
-                try:
-                    rf01_df = pd.read_csv(rf01_file, encoding='utf-8-sig', low_memory=False)
-                    hos01_df = pd.read_csv(hos01_file, encoding='utf-8-sig', low_memory=False)
-
-                    required_cols_map = {
-                        "RF01": (rf01_df, ['Country']),
-                        "HOS01": (hos01_df, ['Country'])
-                    }
-
-                    for name, (df, cols) in required_cols_map.items():
-                        df.columns = df.columns.str.strip()
-                        if not all(col in df.columns for col in cols):
-                            st.error(
-                                f"**Error in {name} file!** It's missing one or more essential columns.\n\n"
-                                f"**Required columns:** `{cols}`\n\n"
-                                f"**Actual columns found:** `{df.columns.tolist()}`\n\n"
-                                "Please check the CSV file for extra rows above the header or formatting issues."
-                            )
-                            return
-                    
-                    changed_df, rf_df_filtered = process_data(rf01_df, hos01_df, selected_countries)
-                    st.session_state['i01_changed_df'] = changed_df
-                    st.session_state['i01_rf_df_filtered'] = rf_df_filtered
-                    st.session_state['i01_processed'] = True
-                    st.rerun()
-
-                except Exception as e:
-                    st.error(f"An unexpected error occurred: {e}")
-    
+            start_job("I01", run, rf01_file, hos01_file, selected_countries)
+
+    job_status("I01", "i01")
+
     if st.session_state.get('i01_processed', False):
-        changed_df = st.session_state['i01_changed_df']
-        rf_df_filtered = st.session_state['i01_rf_df_filtered']
+        changed_df = RESULT_STORE.get(st.session_state['i01_changed_df'])
+        rf_df_filtered = RESULT_STORE.get(st.session_state['i01_rf_df_filtered'])
+        if changed_df is None or rf_df_filtered is None:
+            clear_results(['i01_changed_df', 'i01_rf_df_filtered', 'i01_processed', 'i01_metrics', 'i01_archive'])
+            st.warning(RESULTS_EXPIRED_MESSAGE)
+            return
         
         st.subheader("Results")
         if changed_df.empty:
             st.success("No differences found!")
         else:
             st.warning(f"Found {len(changed_df)} differences.")
-            st.dataframe(changed_df)
-
-        files_to_zip = {}
-        if not changed_df.empty:
-            files_to_zip["I01_changes.xlsx"] = changed_df
+            result_preview(changed_df, key="i01")
 
-        for country in rf_df_filtered[rf_df_filtered['Country'].isin(selected_countries)]['Country'].unique():
-            country_df = rf_df_filtered[rf_df_filtered['Country'] == country].iloc[:, :-4]
-            files_to_zip[f"I01_{country}.xlsx"] = country_df
+        archive_download(
+            [st.session_state['i01_changed_df'], st.session_state['i01_rf_df_filtered']],
+            partial(export_files, changed_df, rf_df_filtered), "I01_Output.zip", key="i01",
+        )
 
-        if files_to_zip:
-            zip_bytes = to_zip(files_to_zip)
-            st.download_button("Download All Files as .zip", zip_bytes, "I01_Output.zip", "application/zip", key="i01_zip_dl")
+        if 'i01_metrics' in st.session_state:
+            with st.expander("Performance breakdown"):
+                st.dataframe(st.session_state['i01_metrics'].to_frame(), hide_index=True)
 
         if st.button("Clear Results", key="i01_clear"):
-            for key in ['i01_changed_df', 'i01_rf_df_filtered', 'i01_processed']:
-                if key in st.session_state: del st.session_state[key]
+            clear_results(['i01_changed_df', 'i01_rf_df_filtered', 'i01_processed', 'i01_metrics', 'i01_archive'], job="I01")
             st.rerun()
@@ -0,0 +1,95 @@
+import streamlit as st
+from functools import partial
+from utils import CSV_UPLOAD_TYPES
+from engines import DEFAULT_ENGINE
+from interfaces import InterfaceSpec
+from pipeline import output_files, process
+from modules.components import (
+    RESULTS_EXPIRED_MESSAGE, archive_download, clear_results, job_status,
+    read_input, reference_file_input, result_preview, start_job, validate_inputs,
+)
+from reference_store import REFERENCE_FILES
+from result_store import RESULT_STORE
+
+def run(spec: InterfaceSpec, files, selected_countries, engine=DEFAULT_ENGINE):
+    """
+    Reads and validates the inputs of an interface, processes them and stores
+    the result. Runs as a background job; returns the result's session state values.
+
+    Args:
+        files: The uploads or snapshots, in the order of spec.inputs.
+
+    Raises:
+        SchemaError: If an input lacks required columns.
+    """
+    columns = {schema: spec.input_columns(schema) for schema in spec.schemas}
+    frames = {
+        schema: read_input(file, schema, selected_countries, columns[schema])
+        for schema, file in zip(spec.schemas, files)
+    }
+    validate_inputs(frames.items(), columns)
+    processed_df = process(spec, frames, selected_countries, engine=engine)
+    return {f'{spec.key}_processed_df': RESULT_STORE.put(processed_df)}
+
+def render(spec: InterfaceSpec):
+    """
+    Renders the page of an interface: an upload per input, processing as a
+    background job, and the results with their download.
+    """
+    key = spec.key
+    result_keys = [f'{key}_processed_df', f'{key}_processed', f'{key}_metrics', f'{key}_archive']
+    st.header(spec.title)
+
+    if 'selected_countries' not in st.session_state or not st.session_state['selected_countries']:
+        st.warning("Please select countries on the '⚙️ Global Country Selection' page first.")
+        return
+
+    selected_countries = st.session_state['selected_countries']
+    st.info(f"Processing for: **{', '.join(selected_countries)}**")
+
+    files = []
+    for column, input_spec in zip(st.columns(len(spec.inputs)), spec.inputs):
+        widget_key = f"{key}_{input_spec.schema.lower()}"
+        with column:
+            if input_spec.schema in REFERENCE_FILES:
+                files.append(reference_file_input(input_spec.label, input_spec.schema, key=widget_key))
+            else:
+                files.append(st.file_uploader(input_spec.label, type=CSV_UPLOAD_TYPES, key=widget_key))
+
+    if all(files):
+        label = "Process Files" if len(files) > 1 else "Process File"
+        if st.button(label, key=f"{key}_process"):
+            options = {'engine': st.session_state.get('engine', DEFAULT_ENGINE)} if spec.match else {}
+            start_job(spec.name, run, spec, files, selected_countries, **options)
+
+    job_status(spec.name, key)
+
+    if st.session_state.get(f'{key}_processed', False):
+        processed_df = RESULT_STORE.get(st.session_state[f'{key}_processed_df'])
+        if processed_df is None:
+            clear_results(result_keys)
+            st.warning(RESULTS_EXPIRED_MESSAGE)
+            return
+
+        st.subheader("Results")
+        if processed_df.empty:
+            st.info("No matching records found." if spec.match else "No data found for the selected countries.")
+        else:
+            if spec.match:
+                st.success(f"Process complete! Found {len(processed_df)} unique matching records.")
+                result_preview(processed_df, key=key)
+            else:
+                st.success(f"Data processed. Found data for {processed_df[spec.key_cols[0]].nunique()} countries.")
+
+            archive_download(
+                [st.session_state[f'{key}_processed_df']], partial(output_files, spec, processed_df),
+                f"{spec.name}_Output.zip", key=key,
+            )
+
+        if f'{key}_metrics' in st.session_state:
+            with st.expander("Performance breakdown"):
+                st.dataframe(st.session_state[f'{key}_metrics'].to_frame(), hide_index=True)
+
+        if st.button("Clear Results", key=f"{key}_clear"):
+            clear_results(result_keys, job=spec.name)
+            st.rerun()
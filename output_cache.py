@@ -0,0 +1,57 @@
+import os
+import threading
+
+from file_store import evict_files
+
+# Where rendered country files are kept between runs for incremental exports.
+OUTPUT_CACHE_DIR = os.environ.get(
+    "RF2HOS_OUTPUT_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "output_cache")
+)
+
+# Disk budget for cached files; the least recently used are deleted beyond it.
+OUTPUT_CACHE_MAX_BYTES = 2 * 1024 * 1024 * 1024
+
+class OutputCache:
+    """
+    Rendered export files by content fingerprint (see utils.partition_fingerprint).
+    A file's modification time is its last use.
+    """
+
+    def __init__(self, directory: str = OUTPUT_CACHE_DIR, max_bytes: int = OUTPUT_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def _path(self, fingerprint: str) -> str:
+        return os.path.join(self.directory, fingerprint)
+
+    def contains(self, fingerprint: str) -> bool:
+        return os.path.exists(self._path(fingerprint))
+
+    def get(self, fingerprint: str) -> bytes | None:
+        path = self._path(fingerprint)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)
+            return data
+        except FileNotFoundError:
+            return None
+
+    def put(self, fingerprint: str, data: bytes):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(fingerprint)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def evict(self):
+        """
+        Deletes the least recently used files until the cache fits its disk budget.
+        """
+        with self._lock:
+            evict_files(self.directory, self.max_bytes)
+
+# Shared by every session and module of the app, and by batch runs.
+OUTPUT_CACHE = OutputCache()
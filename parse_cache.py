@@ -0,0 +1,167 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+from utils import concat_frames, read_csv_filtered, remove_unused_categories
+
+# Memory budget for parsed uploads kept across reruns and modules.
+PARSE_CACHE_MAX_BYTES = 1024 * 1024 * 1024
+# Uploads up to this size are parsed for every country on a miss, so a later
+# change of country selection needs no parse. Parsed rows take about 1.5x the
+# CSV's size (more for compressed uploads), so they fit the budget above.
+# Larger uploads are parsed only for the selected countries, keeping peak
+# memory to the selected slice as read_csv_filtered does.
+PARSE_CACHE_WHOLE_FILE_MAX_BYTES = PARSE_CACHE_MAX_BYTES // 8
+
+def file_digest(file) -> str:
+    """
+    Returns a hash of a file's content. File objects are rewound afterwards.
+
+    Args:
+        file: A path or binary file-like object (e.g. a Streamlit upload).
+    """
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, 'rb') as f:
+            return hashlib.file_digest(f, 'blake2b').hexdigest()
+    file.seek(0)
+    digest = hashlib.file_digest(file, 'blake2b').hexdigest()
+    file.seek(0)
+    return digest
+
+def file_size(file) -> int:
+    """
+    Returns the size of a file in bytes, as stored (compressed files are not inflated).
+    File objects are rewound afterwards.
+    """
+    if isinstance(file, (str, os.PathLike)):
+        return os.path.getsize(file)
+    size = file.seek(0, os.SEEK_END)
+    file.seek(0)
+    return size
+
+def frame_nbytes(df: pd.DataFrame) -> int:
+    """
+    Returns the memory used by a DataFrame, including its string contents.
+    """
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+class _CacheEntry:
+    """
+    The parsed rows of one file, split by country.
+    `scanned` holds every country the file has been searched for, including
+    those with no rows, so later lookups for them need no parse. `complete` is
+    set once the whole file has been parsed.
+    """
+
+    def __init__(self, template: pd.DataFrame):
+        self.template = template
+        self.frames = {}
+        self.scanned = set()
+        self.complete = False
+        self.nbytes = 0
+
+    def add(self, df: pd.DataFrame, countries, country_col: str):
+        """
+        Adds the rows parsed for `countries`, or for every country if it is None.
+        """
+        for country, country_df in df.groupby(country_col, sort=False, observed=True):
+            country_df = remove_unused_categories(country_df)
+            self.frames[country] = country_df
+            self.nbytes += frame_nbytes(country_df)
+        if countries is None:
+            self.complete = True
+        else:
+            self.scanned.update(countries)
+
+    def missing(self, countries) -> list:
+        if self.complete:
+            return []
+        return [c for c in countries if c not in self.scanned]
+
+    def assemble(self, countries) -> pd.DataFrame:
+        parts = [self.frames[c] for c in dict.fromkeys(countries) if c in self.frames]
+        if not parts:
+            return self.template.copy()
+        # The row labels are the rows' positions in the file, so sorting on them
+        # restores the file order across countries.
+        return concat_frames(parts).sort_index()
+
+class ParseCache:
+    """
+    An LRU cache of parsed CSV uploads, keyed by content hash and read options.
+    Rows are cached per country. Uploads up to `whole_file_max_bytes` are parsed
+    for every country on their first miss, so any later country selection is
+    served without parsing. Larger uploads are parsed only for the countries
+    not seen before, so peak memory stays with the selected slice; adding a
+    country to the selection then parses the file again for that country.
+    """
+
+    def __init__(self, max_bytes: int = PARSE_CACHE_MAX_BYTES,
+                 whole_file_max_bytes: int = PARSE_CACHE_WHOLE_FILE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.whole_file_max_bytes = whole_file_max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def nbytes(self) -> int:
+        return sum(entry.nbytes for entry in self._entries.values())
+
+    def read_csv(self, file, selected_countries, country_col: str = 'Country', digest: str | None = None,
+                 **read_kwargs) -> pd.DataFrame:
+        """
+        Returns the rows of a CSV for the selected countries, like read_csv_filtered,
+        parsing the file only if some of them are not cached yet.
+        `digest` is the file's file_digest, if the caller has computed it already.
+        """
+        key = (digest or file_digest(file), country_col, tuple(sorted((k, repr(v)) for k, v in read_kwargs.items())))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                missing = entry.missing(selected_countries)
+            else:
+                missing = list(selected_countries)
+            if not missing:
+                self.hits += 1
+                return entry.assemble(selected_countries)
+            self.misses += 1
+
+        if file_size(file) <= self.whole_file_max_bytes:
+            missing = None
+        df = read_csv_filtered(file, missing, country_col=country_col, **read_kwargs)
+        if country_col not in df.columns:
+            return df
+
+        with self._lock:
+            entry = self._entries.setdefault(key, _CacheEntry(df.iloc[0:0]))
+            self._entries.move_to_end(key)
+            entry.add(df, missing, country_col)
+            result = entry.assemble(selected_countries)
+            self._evict()
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def _evict(self):
+        total = self.nbytes
+        while self._entries and total > self.max_bytes:
+            _, entry = self._entries.popitem(last=False)
+            total -= entry.nbytes
+
+# Shared by all modules and sessions of the app process.
+PARSE_CACHE = ParseCache()
+
+def read_csv_cached(file, selected_countries, **kwargs) -> pd.DataFrame:
+    """
+    Reads the rows of a CSV for the selected countries through the shared PARSE_CACHE.
+    """
+    return PARSE_CACHE.read_csv(file, selected_countries, **kwargs)
@@ -0,0 +1,78 @@
+"""
+Runs the interfaces declared in interfaces.py.
+
+Every spec goes through the same steps: filter the primary rows by country and
+excluded codes in one pass, append the rows taken over from other inputs, then
+keep the first row per key found in every reference input. The output is split
+into one file per country.
+"""
+import pandas as pd
+
+from engines import DEFAULT_ENGINE, first_match_mask, reference_rows
+from instrumentation import stage
+from interfaces import InterfaceSpec
+from utils import concat_frames, partition_by_country
+
+def _appended_rows(spec: InterfaceSpec, frames: dict[str, pd.DataFrame], selected_countries,
+                   primary_df: pd.DataFrame) -> pd.DataFrame:
+    append = spec.append
+    source_df = frames[append.schema]
+    country_col = spec.key_cols[0]
+    mask = source_df[country_col].isin(selected_countries) & source_df[spec.code_col].isin(append.codes)
+    # Map the source columns onto the primary layout
+    converted_df = source_df[mask].reindex(columns=list(append.columns)).assign(**append.constants)
+    converted_df = converted_df.reindex(columns=primary_df.columns)
+    # Columns that are categorical in the primary rows stay so once appended
+    # (see concat_frames), including the constants and columns RF51 lacks
+    categorical = [
+        col for col, dtype in primary_df.dtypes.items()
+        if isinstance(dtype, pd.CategoricalDtype) and not isinstance(converted_df[col].dtype, pd.CategoricalDtype)
+    ]
+    return converted_df.astype({col: 'str' for col in categorical}).astype({col: 'category' for col in categorical})
+
+def process(spec: InterfaceSpec, frames: dict[str, pd.DataFrame], selected_countries,
+            engine: str = DEFAULT_ENGINE) -> pd.DataFrame:
+    """
+    Runs an interface on its parsed inputs.
+
+    Args:
+        spec: The interface to run.
+        frames: The parsed inputs by schema key.
+        selected_countries: The country codes to keep.
+        engine: The engine matching keys against the reference inputs (see engines.py).
+
+    Returns:
+        pd.DataFrame: The output rows.
+    """
+    primary_df = frames[spec.primary]
+    country_col = spec.key_cols[0]
+    with stage("filter countries", rows_in=len(primary_df)) as s:
+        # Country and excluded codes are filtered in one pass, so the primary
+        # rows are copied once
+        mask = primary_df[country_col].isin(selected_countries)
+        if spec.exclude_codes:
+            mask &= ~primary_df[spec.code_col].isin(spec.exclude_codes)
+        df = primary_df[mask]
+        s.rows_out = len(df)
+
+    if spec.append is not None:
+        with stage(f"append {spec.append.schema}", rows_in=len(df)) as s:
+            converted_df = _appended_rows(spec, frames, selected_countries, df)
+            if not converted_df.empty:
+                df = concat_frames([df, converted_df]).reset_index(drop=True)
+            s.rows_out = len(df)
+
+    if not spec.match:
+        return df
+
+    # Keep the first row per key that exists in every reference input
+    with stage("dedup + semi-join", rows_in=len(df)) as s:
+        references = [reference_rows(frames[schema], selected_countries, country_col) for schema in spec.match]
+        keep = first_match_mask(df, *references, key_cols=spec.key_cols, engine=engine)
+        df = df[keep].reset_index(drop=True)
+        s.rows_out = len(df)
+    return df
+
+def output_files(spec: InterfaceSpec, df: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    """Returns the export files of an interface's output: one per country."""
+    return partition_by_country(df, spec.name, country_col=spec.key_cols[0])
@@ -0,0 +1,105 @@
+import os
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from schemas import SCHEMAS
+from utils import infer_numbers, lenient_dtypes, open_csv, parse_numbers, remove_unused_categories, resolve_dtypes
+
+# Where snapshots are stored; one sub-directory per quarter.
+REFERENCE_DIR = os.environ.get(
+    "RF2HOS_REFERENCE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "reference_data")
+)
+
+# HOS validation extracts that change once a quarter, by schema key.
+REFERENCE_FILES = ("HOS01", "I35", "I36", "I37", "I38_HOS")
+
+QUARTER_PATTERN = re.compile(r"^\d{4}Q[1-4]$")
+
+# A stored snapshot of one reference file, e.g. Snapshot("I37", "2026Q4").
+Snapshot = namedtuple("Snapshot", ["name", "quarter"])
+
+def snapshot_path(name: str, quarter: str) -> str:
+    return os.path.join(REFERENCE_DIR, quarter, f"{name}.arrow")
+
+def import_snapshot(file, name: str, quarter: str) -> Snapshot:
+    """
+    Parses a HOS reference CSV (plain or compressed) once and stores it as an uncompressed Arrow IPC file,
+    which later loads are able to memory-map instead of parsing.
+
+    Args:
+        file: A path or file-like object (e.g. a Streamlit upload).
+        name: A key of REFERENCE_FILES.
+        quarter: The quarter the extract belongs to, e.g. "2026Q4".
+
+    Raises:
+        ValueError: If the name or quarter is invalid, or the file lacks required columns.
+    """
+    if name not in REFERENCE_FILES:
+        raise ValueError(f"{name} is not a reference file; expected one of {list(REFERENCE_FILES)}.")
+    if not QUARTER_PATTERN.match(quarter):
+        raise ValueError(f"Invalid quarter {quarter!r}; expected e.g. 2026Q4.")
+
+    schema = SCHEMAS[name]
+    header_row = schema.header_row(file)
+    # Columns are typed as uploads are (see utils.read_csv_filtered)
+    declared, numeric = lenient_dtypes(schema.dtypes)
+    dtype = resolve_dtypes(file, declared, default='str', encoding='utf-8-sig', skiprows=header_row)
+    with open_csv(file) as f:
+        df = pd.read_csv(f, encoding='utf-8-sig', dtype=dtype, skiprows=header_row, low_memory=False)
+    df.columns = df.columns.str.strip()
+    df = infer_numbers(parse_numbers(df, numeric), [col for col in df.columns if col not in declared])
+
+    path = snapshot_path(name, quarter)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    # Write to a temporary name first so readers never map a half-written file
+    tmp_path = f"{path}.tmp"
+    with pa.OSFile(tmp_path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp_path, path)
+    return Snapshot(name, quarter)
+
+def list_quarters(name: str) -> list[str]:
+    """
+    Returns the quarters with a stored snapshot of `name`, newest first.
+    """
+    if not os.path.isdir(REFERENCE_DIR):
+        return []
+    quarters = [
+        quarter for quarter in os.listdir(REFERENCE_DIR)
+        if QUARTER_PATTERN.match(quarter) and os.path.exists(snapshot_path(name, quarter))
+    ]
+    return sorted(quarters, reverse=True)
+
+@lru_cache(maxsize=32)
+def _open_table(path: str, mtime: float) -> pa.Table:
+    # The table's buffers point into the memory map, so its pages are shared
+    # with every other process that maps the same snapshot.
+    return pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+
+def load_snapshot(snapshot: Snapshot, selected_countries=None, country_col: str = 'Country',
+                  columns=None) -> pd.DataFrame:
+    """
+    Loads a stored snapshot, converting only the rows for the selected countries
+    and the requested columns.
+
+    Args:
+        snapshot: The snapshot to load.
+        selected_countries: The country codes to keep, or None for all rows.
+        country_col: The column holding the country code.
+        columns: The columns to load, or None for all of them. The country
+            column is always loaded; columns not in the snapshot are left out.
+    """
+    path = snapshot_path(*snapshot)
+    table = _open_table(path, os.path.getmtime(path))
+    if columns is not None:
+        table = table.select([col for col in table.column_names if col in columns or col == country_col])
+    if selected_countries is None:
+        return table.to_pandas()
+    table = table.filter(pc.is_in(table[country_col], value_set=pa.array(list(selected_countries), type=pa.string())))
+    # The filtered columns still carry the dictionary of every country
+    return remove_unused_categories(table.to_pandas())
@@ -0,0 +1,86 @@
+import os
+import tempfile
+import threading
+import uuid
+from collections import namedtuple
+
+import pandas as pd
+from file_store import evict_files, frame_to_parquet
+
+# Where processed results are spilled; shared by all sessions of the app.
+RESULT_DIR = os.environ.get("RF2HOS_RESULT_DIR", os.path.join(tempfile.gettempdir(), "rf2hos_results"))
+
+# Results not read for this long are deleted, e.g. those of closed browser sessions.
+RESULT_TTL_SECONDS = 8 * 60 * 60
+
+# Disk budget for stored results; the least recently read are deleted beyond it.
+RESULT_STORE_MAX_BYTES = 5 * 1024 * 1024 * 1024
+
+# A stored result. Only this is kept in session state, never the frame itself.
+ResultHandle = namedtuple("ResultHandle", ["result_id", "rows"])
+
+class ResultStore:
+    """
+    Keeps processed results as zstd-compressed Parquet files on local disk and
+    loads them back only when a page shows or exports them.
+
+    A file's modification time is its last read, which drives both the TTL
+    and the size-based eviction.
+    """
+
+    def __init__(self, directory: str = RESULT_DIR, ttl_seconds: float = RESULT_TTL_SECONDS,
+                 max_bytes: int = RESULT_STORE_MAX_BYTES):
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def _path(self, result_id: str) -> str:
+        return os.path.join(self.directory, f"{result_id}.parquet")
+
+    def put(self, df: pd.DataFrame) -> ResultHandle:
+        """
+        Stores a frame and returns its handle. Expired results are evicted first.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        self.evict()
+        handle = ResultHandle(uuid.uuid4().hex, len(df))
+        path = self._path(handle.result_id)
+        tmp_path = f"{path}.tmp"
+        frame_to_parquet(df, tmp_path, compression='zstd')
+        os.replace(tmp_path, path)
+        return handle
+
+    def get(self, handle: ResultHandle) -> pd.DataFrame | None:
+        """
+        Loads a stored frame, or returns None if it has been evicted.
+        """
+        path = self._path(handle.result_id)
+        try:
+            os.utime(path)
+            return pd.read_parquet(path)
+        except FileNotFoundError:
+            return None
+
+    def delete(self, handle: ResultHandle):
+        try:
+            os.remove(self._path(handle.result_id))
+        except FileNotFoundError:
+            pass
+
+    def evict(self, now: float | None = None):
+        """
+        Deletes results not read within the TTL, then the least recently read
+        ones until the store fits its disk budget.
+        """
+        with self._lock:
+            evict_files(self.directory, self.max_bytes, self.ttl_seconds, now)
+
+    @property
+    def nbytes(self) -> int:
+        if not os.path.isdir(self.directory):
+            return 0
+        return sum(entry.stat().st_size for entry in os.scandir(self.directory) if entry.name.endswith(".parquet"))
+
+# Shared by every session and module of the app.
+RESULT_STORE = ResultStore()
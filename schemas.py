@@ -0,0 +1,105 @@
+from dataclasses import dataclass, replace
+
+from utils import PREFLIGHT_BYTES, find_header_row
+
+class SchemaError(ValueError):
+    """Raised when an input file does not have the columns its schema requires."""
+
+@dataclass(frozen=True)
+class InterfaceSchema:
+    """
+    Describes the columns of one interface file.
+    The same definition sets the dtypes used when parsing and the columns
+    required when validating an upload. Declared columns that are missing from a
+    file are ignored when parsing.
+
+    Attributes:
+        name: The name shown in error messages, e.g. "I38 RF".
+        required: Columns that must be present.
+        categorical: Repeated text columns, parsed as pandas categoricals.
+        numeric: Numeric columns, parsed as floats.
+    """
+    name: str
+    required: tuple[str, ...]
+    categorical: tuple[str, ...] = ()
+    numeric: tuple[str, ...] = ()
+
+    @property
+    def dtypes(self) -> dict[str, str]:
+        """The dtype of each declared column, as passed to read_csv."""
+        dtypes = {col: 'category' for col in self.categorical}
+        dtypes.update({col: 'float64' for col in self.numeric})
+        return dtypes
+
+    def missing_columns(self, columns) -> list[str]:
+        """Returns the required columns that are not in `columns`."""
+        return [col for col in self.required if col not in columns]
+
+    def select(self, columns) -> "InterfaceSchema":
+        """
+        Returns the schema of the file read with only `columns`: just those are
+        required and given dtypes.
+        """
+        return replace(
+            self,
+            required=tuple(col for col in self.required if col in columns),
+            categorical=tuple(col for col in self.categorical if col in columns),
+            numeric=tuple(col for col in self.numeric if col in columns),
+        )
+
+    def header_row(self, file) -> int:
+        """
+        Checks the header of a CSV file before it is parsed, allowing for preamble
+        lines above it (see utils.find_header_row).
+
+        Returns:
+            int: The number of rows above the header.
+
+        Raises:
+            SchemaError: If no header with the required columns is found, or a
+                compressed file cannot be read.
+        """
+        try:
+            header_row = find_header_row(file, self.required)
+        except ValueError as e:
+            raise SchemaError(f"Cannot read the {self.name} file: {e}") from e
+        if header_row is None:
+            raise SchemaError(
+                f"No header row with the required columns {list(self.required)} was found "
+                f"in the first {PREFLIGHT_BYTES // 1024} KB of the {self.name} file."
+            )
+        return header_row
+
+# Columns shared by the country master files (RF01/HOS01).
+COUNTRY_MASTER_NUMERIC = (
+    "h_cost_rate", "h_trav_CM", "h_trav_PM", "mat_hand", "LaborGM", "PartsGM",
+    "TP_LP_UP", "FP_LP_UP", "NBV_LAT", "NBV_NPC", "NBV_UPLIFT",
+)
+
+# Columns shared by the attribute value files (I35-I38, I51-I53).
+ATTRIBUTE_REQUIRED = ('Country', 'Attribute Value Code')
+ATTRIBUTE_CATEGORICAL = (
+    'Country', 'Attribute Value Code', 'Display Group Code', 'Attribute Value Price Type',
+    'Attribute Deactivated YN', 'RSM Type', 'Currency', 'Price Book Name', 'Server', 'Changed By',
+)
+ATTRIBUTE_NUMERIC = (
+    'Attribute Value FP', 'Attribute Value TP', 'Attribute Value LP',
+    'Attribute Value MMFP', 'Attribute Value MMTP', 'Attribute Value MMLP', 'Local FP',
+)
+
+def _attribute_schema(name: str) -> InterfaceSchema:
+    return InterfaceSchema(name, ATTRIBUTE_REQUIRED, ATTRIBUTE_CATEGORICAL, ATTRIBUTE_NUMERIC)
+
+SCHEMAS = {
+    "RF01": InterfaceSchema("RF01", ('Country',), ('Country',), COUNTRY_MASTER_NUMERIC),
+    "HOS01": InterfaceSchema("HOS01", ('Country',), ('Country',), COUNTRY_MASTER_NUMERIC),
+    "I34": InterfaceSchema("I34 RF", ('Country',), ('Country', 'Currency', 'Server', 'Changed By'), ATTRIBUTE_NUMERIC),
+    "I35": _attribute_schema("I35 HOS"),
+    "I36": _attribute_schema("I36 HOS"),
+    "I37": _attribute_schema("I37 HOS"),
+    "I38_HOS": _attribute_schema("I38 HOS"),
+    "I38": _attribute_schema("I38 RF"),
+    "I51": _attribute_schema("I51 RF"),
+    "I52": _attribute_schema("I52 RF"),
+    "I53": _attribute_schema("I53 RF"),
+}
@@ -0,0 +1,124 @@
+"""
+One in-memory copy of each HOS reference frame for the whole app process.
+
+Reference extracts are the same for every analyst in a quarter, so concurrent
+sessions loading the same content for the same countries get the very same
+DataFrame object instead of one copy each. Values derived from a shared frame,
+such as its deduplicated key index, are built once and shared with it.
+
+Shared frames must be treated as read-only: filter or copy them, never assign
+to them in place.
+"""
+import threading
+import weakref
+from collections import OrderedDict
+
+import pandas as pd
+from parse_cache import frame_nbytes
+
+# Memory budget for reference frames kept while no session or job uses them.
+SHARED_FRAMES_MAX_BYTES = 512 * 1024 * 1024
+
+class SharedFrames:
+    """
+    Shared frames by content key. A frame stays available for as long as any
+    session or job still holds it, however large; on top of that the most
+    recently used frames are kept within `max_bytes`, so a rerun finds them.
+    """
+
+    def __init__(self, max_bytes: int = SHARED_FRAMES_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._live = weakref.WeakValueDictionary()
+        self._recent = OrderedDict()
+        self._derived = {}
+        self._sizes = {}
+        self._loading = {}
+        self._lock = threading.Lock()
+
+    @property
+    def nbytes(self) -> int:
+        """The memory used by the frames currently shared."""
+        return sum(dict(self._sizes).values())
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def get(self, key, load) -> pd.DataFrame:
+        """
+        Returns the shared frame for `key`, calling `load()` to build it if no
+        session holds one.
+
+        Args:
+            key: A hashable that identifies the frame's content, e.g. a file
+                digest with the read options and selected countries.
+            load: A function returning the frame.
+        """
+        # Sessions asking for the same frame at once wait for one load
+        with self._lock:
+            loading = self._loading.setdefault(key, threading.Lock())
+        with loading:
+            with self._lock:
+                frame = self._live.get(key)
+                if frame is not None:
+                    self.hits += 1
+                    self._keep(key, frame)
+                    return frame
+                self.misses += 1
+            try:
+                frame = load()
+                with self._lock:
+                    self._live[key] = frame
+                    self._derived[id(frame)] = {}
+                    self._sizes[id(frame)] = frame_nbytes(frame)
+                    weakref.finalize(frame, self._forget, id(frame))
+                    self._keep(key, frame)
+            finally:
+                with self._lock:
+                    self._loading.pop(key, None)
+        return frame
+
+    def is_shared(self, frame: pd.DataFrame) -> bool:
+        return id(frame) in self._derived
+
+    def derived(self, frame: pd.DataFrame, name, build):
+        """
+        Returns `build()`, computed once per shared frame and name. For a frame
+        that is not shared it is computed on every call.
+
+        Args:
+            frame: The frame the value is derived from.
+            name: A hashable naming the value, e.g. ("keys", key_cols).
+            build: A function returning the value.
+        """
+        values = self._derived.get(id(frame))
+        if values is None:
+            return build()
+        if name not in values:
+            values.setdefault(name, build())
+        return values[name]
+
+    def clear(self):
+        with self._lock:
+            self._recent.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def _forget(self, frame_id: int):
+        # Runs when a frame is garbage collected, possibly while the lock is held
+        self._derived.pop(frame_id, None)
+        self._sizes.pop(frame_id, None)
+
+    def _keep(self, key, frame: pd.DataFrame):
+        if key in self._recent:
+            self._recent.move_to_end(key)
+        else:
+            self._recent[key] = (frame, self._sizes[id(frame)])
+        total = sum(nbytes for _, nbytes in self._recent.values())
+        while len(self._recent) > 1 and total > self.max_bytes:
+            _, (_, nbytes) = self._recent.popitem(last=False)
+            total -= nbytes
+
+# Shared by every session and module of the app process.
+SHARED_FRAMES = SharedFrames()
@@ -0,0 +1,154 @@
+"""
+Checks that parsing CSV uploads in chunks, with schema dtypes, gives the same
+values and exported cells as reading the whole file with pd.read_csv, as the
+modules originally did. This covers compressed files, lines above the header,
+column projections, the parse cache and stored snapshots.
+"""
+import gzip
+import io
+import zipfile
+
+import openpyxl
+import pandas as pd
+import pytest
+
+import reference_store
+from benchmarks.parity import with_schema_dtypes
+from benchmarks.synthetic import country_codes, generate_dataset
+from interfaces import INTERFACE_SPECS
+from modules.components import read_input
+from parse_cache import ParseCache
+from schemas import SCHEMAS
+from utils import find_header_row, read_csv_filtered, to_excel
+
+def csv_bytes(df: pd.DataFrame) -> bytes:
+    return df.to_csv(index=False).encode('utf-8-sig')
+
+def baseline_read(data: bytes, selected_countries) -> pd.DataFrame:
+    df = pd.read_csv(io.BytesIO(data), encoding='utf-8-sig', low_memory=False)
+    df.columns = df.columns.str.strip()
+    return df[df['Country'].isin(selected_countries)]
+
+def excel_cells(df: pd.DataFrame) -> list[list]:
+    """The cells of the workbook to_excel writes, as (is text, value) pairs."""
+    sheet = openpyxl.load_workbook(io.BytesIO(to_excel(df))).active
+    return [[(isinstance(value, str), value) for value in row] for row in sheet.iter_rows(values_only=True)]
+
+def assert_parsed_like_read_csv(df: pd.DataFrame, data: bytes, name: str, selected_countries, columns=None):
+    """
+    Checks a parsed frame against pd.read_csv of the same bytes: its values and
+    dtypes against the baseline converted to the schema dtypes, and its exported
+    cells against those of the baseline as read.
+    """
+    expected = baseline_read(data, selected_countries)
+    if columns is not None:
+        expected = expected[[col for col in expected.columns if col in columns or col == 'Country']]
+    pd.testing.assert_frame_equal(
+        df.reset_index(drop=True), with_schema_dtypes({name: expected})[name].reset_index(drop=True),
+        check_categorical=False,
+    )
+    assert excel_cells(df) == excel_cells(expected)
+
+@pytest.fixture(scope="module")
+def synthetic():
+    return generate_dataset(500, 6, seed=2)
+
+@pytest.fixture(scope="module")
+def selected_countries():
+    return country_codes(6)[:2]
+
+@pytest.mark.parametrize("name", ["I34", "I38", "I52", "I37", "RF01"])
+def test_chunked_read_parses_like_read_csv(synthetic, selected_countries, name):
+    data = csv_bytes(synthetic[name])
+    df = read_csv_filtered(io.BytesIO(data), selected_countries, chunksize=37, dtype=SCHEMAS[name].dtypes)
+    assert_parsed_like_read_csv(df, data, name, selected_countries)
+
+def _zip(data: bytes) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        archive.writestr("__MACOSX/._I38_RF.csv", b"metadata")
+        archive.writestr("I38_RF.csv", data)
+    return buffer.getvalue()
+
+def _zstd(data: bytes) -> bytes:
+    zstandard = pytest.importorskip("zstandard")
+    return zstandard.ZstdCompressor().compress(data)
+
+@pytest.mark.parametrize("suffix, compress", [(".gz", gzip.compress), (".zst", _zstd), (".zip", _zip)])
+def test_compressed_file_parses_like_read_csv(synthetic, selected_countries, tmp_path, suffix, compress):
+    data = csv_bytes(synthetic["I38"])
+    path = tmp_path / f"I38_RF.csv{suffix}"
+    path.write_bytes(compress(data))
+    df = read_csv_filtered(str(path), selected_countries, chunksize=37, dtype=SCHEMAS["I38"].dtypes)
+    assert_parsed_like_read_csv(df, data, "I38", selected_countries)
+
+def test_upload_with_lines_above_the_header_parses_like_read_csv(synthetic, selected_countries):
+    data = csv_bytes(synthetic["I38"])
+    upload = ("RF attribute export\nCreated,2026-10-01\n" + synthetic["I38"].to_csv(index=False)).encode('utf-8-sig')
+    assert find_header_row(io.BytesIO(upload), SCHEMAS["I38"].required) == 2
+    df = read_input(io.BytesIO(upload), "I38", selected_countries)
+    assert_parsed_like_read_csv(df, data, "I38", selected_countries)
+
+@pytest.mark.parametrize("name", ["I51", "I36"])
+def test_upload_parses_only_the_columns_an_interface_reads(synthetic, selected_countries, name):
+    # I51 is read through the parse cache, the I36 reference file through SHARED_FRAMES
+    data = csv_bytes(synthetic[name])
+    columns = INTERFACE_SPECS["I52"].input_columns(name)
+    df = read_input(io.BytesIO(data), name, selected_countries, columns=columns)
+    assert set(df.columns) < set(synthetic[name].columns)
+    assert_parsed_like_read_csv(df, data, name, selected_countries, columns=columns)
+
+def test_column_mixing_numbers_and_text_across_chunks_stays_text():
+    data = b"Country,Attribute Value Code,Customer Bank Value,RSM Consumption\n" + b"".join(
+        f"GB,A{i},{'007' if i < 3 else 'X9'},{i}\n".encode() for i in range(6)
+    )
+    df = read_csv_filtered(io.BytesIO(data), ['GB'], chunksize=3, dtype=SCHEMAS['I38'].dtypes)
+    expected = baseline_read(data, ['GB'])
+    assert df['Customer Bank Value'].tolist() == ['007', '007', '007', 'X9', 'X9', 'X9']
+    assert df['RSM Consumption'].dtype == expected['RSM Consumption'].dtype
+    assert excel_cells(df) == excel_cells(expected)
+
+def test_price_column_with_text_values_keeps_them():
+    data = b"Country,Attribute Value Code,Attribute Value FP,Attribute Value TP\n" + b"".join(
+        f"GB,A{i},{value},{i}.5\n".encode() for i, value in enumerate(["10", "TBD", '"1,234.50"', "", "7.25"])
+    )
+    df = read_csv_filtered(io.BytesIO(data), ['GB'], chunksize=2, dtype=SCHEMAS['I38'].dtypes)
+    assert df['Attribute Value FP'].tolist()[:3] == ['10', 'TBD', '1,234.50']
+    assert df['Attribute Value TP'].dtype == 'float64'
+    assert excel_cells(df) == excel_cells(baseline_read(data, ['GB']))
+
+def test_snapshot_loads_like_read_csv(synthetic, selected_countries, tmp_path, monkeypatch):
+    monkeypatch.setattr(reference_store, 'REFERENCE_DIR', str(tmp_path))
+    data = csv_bytes(synthetic["I37"])
+    snapshot = reference_store.import_snapshot(io.BytesIO(gzip.compress(data)), "I37", "2026Q4")
+    assert_parsed_like_read_csv(read_input(snapshot, "I37", selected_countries), data, "I37", selected_countries)
+    columns = INTERFACE_SPECS["I38"].input_columns("I37")
+    df = read_input(snapshot, "I37", selected_countries, columns=columns)
+    assert_parsed_like_read_csv(df, data, "I37", selected_countries, columns=columns)
+
+def test_snapshot_for_some_countries_holds_only_their_categories(synthetic, tmp_path, monkeypatch):
+    monkeypatch.setattr(reference_store, 'REFERENCE_DIR', str(tmp_path))
+    data = csv_bytes(synthetic["I37"])
+    snapshot = reference_store.import_snapshot(io.BytesIO(data), "I37", "2026Q4")
+    df = reference_store.load_snapshot(snapshot, country_codes(6)[:1])
+    expected = baseline_read(data, country_codes(6)[:1])
+    assert df['Country'].cat.categories.tolist() == country_codes(6)[:1]
+    assert set(df['Attribute Value Code'].cat.categories) == set(expected['Attribute Value Code'])
+
+def test_parse_cache_serves_a_new_country_selection_without_parsing(synthetic):
+    data = csv_bytes(synthetic["I38"])
+    countries = country_codes(6)
+    cache = ParseCache()
+    for selected_countries in (countries[:2], countries[:1], countries[:3]):
+        df = cache.read_csv(io.BytesIO(data), selected_countries, dtype=SCHEMAS["I38"].dtypes)
+        assert_parsed_like_read_csv(df, data, "I38", selected_countries)
+    assert (cache.misses, cache.hits) == (1, 2)
+
+def test_parse_cache_parses_large_files_only_for_new_countries(synthetic):
+    data = csv_bytes(synthetic["I38"])
+    countries = country_codes(6)
+    cache = ParseCache(whole_file_max_bytes=0)
+    for selected_countries in (countries[:2], countries[:1], countries[:3]):
+        df = cache.read_csv(io.BytesIO(data), selected_countries, dtype=SCHEMAS["I38"].dtypes)
+        assert_parsed_like_read_csv(df, data, "I38", selected_countries)
+    assert (cache.misses, cache.hits) == (2, 1)
@@ -0,0 +1,161 @@
+"""
+Checks the registry-driven pipeline against the semantics of the original
+per-interface modules: filter by country, keep the first row per
+Country + Attribute Value Code key, keep the keys found in every reference
+file, drop the RF51 option codes from I51 and append them to I52. The legacy
+functions below restate that code with its string lookup keys and merges.
+
+    python -m pytest tests
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.parity import edge_case_dataset, with_schema_dtypes
+from benchmarks.synthetic import country_codes, generate_dataset
+from engines import DEFAULT_ENGINE, ENGINES
+from interfaces import INTERFACE_SPECS, RF51_OS_CODES, RF51_TO_I52_COLUMNS, RF51_TO_I52_CONSTANTS
+from modules.i01 import COLUMNS_TO_COMPARE, diff_frames
+from pipeline import output_files, process
+
+MATCH_INTERFACES = [name for name, spec in INTERFACE_SPECS.items() if spec.match]
+
+def _lookup_key(df: pd.DataFrame) -> pd.DataFrame:
+    # Missing values become "nan", as astype(str) did when the modules were written
+    def text(col):
+        return np.asarray(df[col], dtype=object).astype(str).astype(object)
+    return df.assign(lookup_key=text('Country') + text('Attribute Value Code'))
+
+def _dedup(df: pd.DataFrame) -> pd.DataFrame:
+    return _lookup_key(df).drop_duplicates(subset=['lookup_key'], keep='first')
+
+def _semi_join(df: pd.DataFrame, *references: pd.DataFrame) -> pd.DataFrame:
+    for reference in references:
+        df = pd.merge(df, _dedup(reference)[['lookup_key']], on='lookup_key', how='inner')
+    return df
+
+def legacy_process(name: str, frames: dict[str, pd.DataFrame], selected_countries) -> pd.DataFrame:
+    frames = {key: df[df['Country'].isin(selected_countries)] for key, df in frames.items()}
+    if name == "I34":
+        df = frames["I34"]
+    elif name == "I38":
+        df = _semi_join(_dedup(frames["I38"]), frames["I38_HOS"], frames["I37"])
+    elif name == "I51":
+        rf51 = frames["I51"]
+        df = _semi_join(_dedup(rf51[~rf51['Attribute Value Code'].isin(RF51_OS_CODES)]), frames["I37"])
+    elif name == "I52":
+        rf51 = frames["I51"]
+        os_df = _dedup(rf51[rf51['Attribute Value Code'].isin(RF51_OS_CODES)])
+        converted_df = os_df.reindex(columns=[*RF51_TO_I52_COLUMNS, 'lookup_key']).assign(**RF51_TO_I52_CONSTANTS)
+        rf52 = _dedup(frames["I52"])
+        if not converted_df.empty:
+            converted_df = converted_df.reindex(columns=rf52.columns)
+        combined_df = pd.concat([rf52, converted_df], ignore_index=True)
+        df = _semi_join(combined_df.drop_duplicates(subset=['lookup_key'], keep='first'), frames["I36"])
+    elif name == "I53":
+        df = _semi_join(_dedup(frames["I53"]), frames["I35"])
+    return df.drop(columns=['lookup_key'], errors='ignore').reset_index(drop=True)
+
+def legacy_files(name: str, df: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    return {
+        f"{name}_{country}.xlsx": df[df['Country'] == country].iloc[:, :-4]
+        for country in df['Country'].dropna().unique()
+    }
+
+@pytest.fixture(scope="module", params=["edge cases", "synthetic"])
+def dataset(request):
+    if request.param == "edge cases":
+        return with_schema_dtypes(edge_case_dataset()), country_codes(4)
+    return with_schema_dtypes(generate_dataset(3000, 8, seed=3)), country_codes(8)[:3]
+
+def assert_same_rows(actual: pd.DataFrame, expected: pd.DataFrame, check_dtype: bool = True):
+    pd.testing.assert_frame_equal(
+        actual.reset_index(drop=True), expected.reset_index(drop=True), check_dtype=check_dtype, check_categorical=False,
+    )
+
+def legacy_dtypes(name: str) -> bool:
+    # The legacy I52 concat turns categoricals into text; process keeps them
+    # (see test_i52_keeps_the_dtypes_of_the_rf52_rows)
+    return name != "I52"
+
+@pytest.mark.parametrize("name", list(INTERFACE_SPECS))
+def test_process_matches_legacy(dataset, name):
+    frames, selected_countries = dataset
+    assert_same_rows(process(INTERFACE_SPECS[name], frames, selected_countries), legacy_process(name, frames, selected_countries),
+                     check_dtype=legacy_dtypes(name))
+
+@pytest.mark.parametrize("name", list(INTERFACE_SPECS))
+def test_output_files_match_legacy(dataset, name):
+    frames, selected_countries = dataset
+    files = output_files(INTERFACE_SPECS[name], process(INTERFACE_SPECS[name], frames, selected_countries))
+    expected = legacy_files(name, legacy_process(name, frames, selected_countries))
+    assert list(files) == list(expected)
+    for file_name, df in files.items():
+        assert_same_rows(df, expected[file_name], check_dtype=legacy_dtypes(name))
+
+def _attribute_rows(rows, **columns) -> pd.DataFrame:
+    df = pd.DataFrame(rows, columns=['Country', 'Attribute Value Code'])
+    return df.assign(**{col: columns.get(col, "x") for col in RF51_TO_I52_COLUMNS[2:]})
+
+def test_i52_appends_option_rows_after_rf52_rows():
+    frames = {
+        "I52": _attribute_rows([("GB", "A"), ("GB", "HEL_15T_IN"), ("GB", "A")]).assign(**{'Display Group Code': "DG", 'Attribute Value Price Type': "Fixed"}),
+        "I51": _attribute_rows([("GB", "UQCM_IN"), ("GB", "HEL_15T_IN"), ("GB", "B"), ("FR", "UQCM_IN")]),
+        "I36": _attribute_rows([("GB", "A"), ("GB", "UQCM_IN"), ("GB", "HEL_15T_IN"), ("GB", "B"), ("FR", "UQCM_IN")]),
+    }
+    df = process(INTERFACE_SPECS["I52"], frames, ["GB"])
+    assert df[['Country', 'Attribute Value Code']].values.tolist() == [["GB", "A"], ["GB", "HEL_15T_IN"], ["GB", "UQCM_IN"]]
+    # The RF52 row wins over the RF51 option row with the same key
+    assert df['Display Group Code'].tolist() == ["DG", "DG", "LI"]
+    assert df['Attribute Value Price Type'].tolist() == ["Fixed", "Fixed", "Lookup"]
+
+def test_i52_keeps_the_dtypes_of_the_rf52_rows(dataset):
+    frames, selected_countries = dataset
+    df = process(INTERFACE_SPECS["I52"], frames, selected_countries)
+    assert (df['Display Group Code'] == "LI").any()
+    # Categories are unioned with those of the appended rows
+    assert df.dtypes.astype(str).to_dict() == frames["I52"].dtypes.astype(str).to_dict()
+
+def test_i51_drops_option_codes():
+    frames = {
+        "I51": _attribute_rows([("GB", code) for code in (*RF51_OS_CODES, "A")]),
+        "I37": _attribute_rows([("GB", code) for code in (*RF51_OS_CODES, "A")]),
+    }
+    assert process(INTERFACE_SPECS["I51"], frames, ["GB"])['Attribute Value Code'].tolist() == ["A"]
+
+@pytest.mark.parametrize("name", MATCH_INTERFACES)
+def test_engines_return_identical_frames(dataset, name):
+    pytest.importorskip("polars")
+    frames, selected_countries = dataset
+    expected = process(INTERFACE_SPECS[name], frames, selected_countries, engine=DEFAULT_ENGINE)
+    assert len(ENGINES) > 1
+    for engine in ENGINES:
+        pd.testing.assert_frame_equal(process(INTERFACE_SPECS[name], frames, selected_countries, engine=engine), expected)
+
+def legacy_diff(hos01_df: pd.DataFrame, rf01_df: pd.DataFrame) -> pd.DataFrame:
+    merged_df = pd.merge(hos01_df, rf01_df, on="Country", suffixes=('_hos', '_rf'), how='inner')
+    changes = []
+    for column in COLUMNS_TO_COMPARE:
+        differences = merged_df[merged_df[f"{column}_hos"] != merged_df[f"{column}_rf"]]
+        for _, row in differences.iterrows():
+            changes.append({'Country': row['Country'], 'Column': column,
+                            'Old Value': row[f"{column}_hos"], 'New Value': row[f"{column}_rf"]})
+    return pd.DataFrame(changes, columns=['Country', 'Column', 'Old Value', 'New Value'])
+
+def test_i01_diff_matches_legacy():
+    frames = generate_dataset(100, 20, seed=4)
+    expected = legacy_diff(frames["HOS01"], frames["RF01"])
+    assert len(expected) > 0
+    assert_same_rows(diff_frames(frames["HOS01"], frames["RF01"], COLUMNS_TO_COMPARE), expected)
+
+def test_i01_diff_pairs_repeated_keys_one_to_one():
+    old_df = pd.DataFrame({'Country': ["GB", "GB"], 'h_cost_rate': [1.0, 2.0]})
+    new_df = pd.DataFrame({'Country': ["GB", "GB"], 'h_cost_rate': [1.0, 3.0]})
+    changes = diff_frames(old_df, new_df, ['h_cost_rate'])
+    assert changes[['Old Value', 'New Value']].values.tolist() == [[2.0, 3.0]]
+
+def test_i01_diff_missing_values_and_tolerances():
+    old_df = pd.DataFrame({'Country': ["GB", "FR", "DE"], 'h_cost_rate': [np.nan, 1.0, 1.0], 'mat_hand': [1.0, 1.0, 1.0]})
+    new_df = pd.DataFrame({'Country': ["GB", "FR", "DE"], 'h_cost_rate': [np.nan, 1.004, 1.1], 'mat_hand': [1.0, 1.0, np.nan]})
+    changes = diff_frames(old_df, new_df, ['h_cost_rate', 'mat_hand'], tolerances={'h_cost_rate': 0.01})
+    assert changes[['Country', 'Column']].values.tolist() == [["DE", "h_cost_rate"], ["DE", "mat_hand"]]
@@ -1,6 +1,486 @@
+import csv
+import gzip
+import hashlib
 import io
+import json
+import multiprocessing
+import os
+import numpy as np
 import pandas as pd
+import tempfile
 import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing, contextmanager
+from functools import partial
+from openpyxl import Workbook
+
+from file_store import frame_to_parquet
+from instrumentation import stage
+from jobs import checkpoint, report_progress
+
+try:
+    import zstandard
+except ImportError:  # Optional dependency, only needed for .zst inputs
+    zstandard = None
+
+# Number of CSV rows parsed per chunk when streaming uploads.
+CSV_CHUNK_SIZE = 100_000
+
+# How much of an upload is read to find its header row before parsing.
+PREFLIGHT_BYTES = 64 * 1024
+
+# The leading bytes of the compressed formats accepted for CSV inputs.
+COMPRESSION_MAGIC = {b"\x1f\x8b": "gzip", b"\x28\xb5\x2f\xfd": "zstd", b"PK\x03\x04": "zip"}
+
+# File extensions the uploaders accept: plain, gzip- or zstd-compressed CSVs and
+# zip archives holding a single CSV.
+CSV_UPLOAD_TYPES = ["csv", "gz", "zst", "zip"]
+
+# Exports with fewer files than this are rendered serially; a process pool
+# costs more to start than it saves on a handful of workbooks.
+PARALLEL_EXPORT_MIN_FILES = 8
+
+# Export workers are started from job threads; forking there would copy locks
+# other threads hold, so they start from a clean server process instead, which
+# imports this module once rather than in every worker.
+EXPORT_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+EXPORT_CONTEXT = multiprocessing.get_context(EXPORT_START_METHOD)
+if EXPORT_START_METHOD == "forkserver":
+    EXPORT_CONTEXT.set_forkserver_preload([__name__])
+
+# Zip archives larger than this are spilled from memory to a temporary file.
+ZIP_SPILL_THRESHOLD = 32 * 1024 * 1024
+
+# Columns identifying a record across the RF and HOS files.
+KEY_COLUMNS = ('Country', 'Attribute Value Code')
+
+# Columns that are dropped from every exported file: the helper key added during
+# processing, plus the trailing RF audit columns.
+EXPORT_DROP_COLUMNS = ('lookup_key',)
+EXPORT_TRAILING_COLUMNS_TO_DROP = 4
+
+# The format used for exports unless a module or run picks another one.
+DEFAULT_EXPORT_FORMAT = 'xlsx'
+
+def csv_compression(file) -> str | None:
+    """
+    Returns the compression of a CSV input from its leading bytes: "gzip",
+    "zstd" or "zip", or None for a plain CSV. File objects are rewound afterwards.
+    """
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, 'rb') as f:
+            head = f.read(4)
+    else:
+        file.seek(0)
+        head = file.read(4)
+        file.seek(0)
+    for magic, compression in COMPRESSION_MAGIC.items():
+        if head.startswith(magic):
+            return compression
+    return None
+
+def _is_zip_data_member(info: zipfile.ZipInfo) -> bool:
+    # Archivers add metadata members, e.g. macOS adds __MACOSX/._<name>
+    name = info.filename
+    return not info.is_dir() and not name.startswith('__MACOSX/') and not os.path.basename(name).startswith('.')
+
+@contextmanager
+def open_csv(file):
+    """
+    Opens a CSV input as a binary stream. Compressed inputs (.gz, .zst, or a
+    .zip holding one file) are decompressed as the stream is read, so they are
+    never inflated in memory as a whole. File objects are rewound afterwards.
+
+    Args:
+        file: A path or binary file-like object (e.g. a Streamlit upload).
+
+    Raises:
+        ValueError: If a zip archive does not hold exactly one file (hidden files
+            and __MACOSX metadata aside), or a .zst input is given without the
+            zstandard package installed.
+    """
+    compression = csv_compression(file)
+    is_path = isinstance(file, (str, os.PathLike))
+    raw = open(file, 'rb') if is_path else file
+    try:
+        if compression == "gzip":
+            with gzip.GzipFile(fileobj=raw) as stream:
+                yield stream
+        elif compression == "zstd":
+            if zstandard is None:
+                raise ValueError("Reading .zst files requires the zstandard package.")
+            with zstandard.ZstdDecompressor().stream_reader(raw, closefd=False) as stream:
+                yield stream
+        elif compression == "zip":
+            with zipfile.ZipFile(raw) as archive:
+                members = [info for info in archive.infolist() if _is_zip_data_member(info)]
+                if len(members) != 1:
+                    raise ValueError(f"A zip file must contain exactly one CSV file, found {len(members)}.")
+                with archive.open(members[0]) as stream:
+                    yield stream
+        else:
+            yield raw
+    finally:
+        if is_path:
+            raw.close()
+        else:
+            raw.seek(0)
+
+def read_csv_header(file, **read_kwargs) -> list[str]:
+    """
+    Returns the column names of a CSV file as written, without parsing its rows.
+    File objects are rewound afterwards.
+    """
+    read_kwargs.setdefault('encoding', 'utf-8-sig')
+    with open_csv(file) as f:
+        return pd.read_csv(f, nrows=0, **read_kwargs).columns.tolist()
+
+def find_header_row(file, required_columns, max_bytes: int = PREFLIGHT_BYTES,
+                    encoding: str = 'utf-8-sig') -> int | None:
+    """
+    Finds the header row of a CSV file from its first `max_bytes` bytes, so a file
+    with preamble lines above the header is caught without parsing its rows.
+    File objects are rewound afterwards.
+
+    Args:
+        file: A path or binary file-like object (e.g. a Streamlit upload).
+        required_columns: The columns the header must contain.
+        max_bytes: How much of the file to search.
+        encoding: The file's encoding.
+
+    Returns:
+        int | None: The number of rows above the header, to pass to pd.read_csv as
+        `skiprows`, or None if no row in the searched part holds every required column.
+    """
+    with open_csv(file) as f:
+        head = f.read(max_bytes)
+
+    text = head.decode(encoding, errors='replace')
+    if len(head) == max_bytes:
+        # The last line may be cut off
+        text = text[:text.rfind('\n') + 1]
+    # skiprows counts records like the csv module does, so a quoted field
+    # spanning several lines counts once
+    required = set(required_columns)
+    for row_number, row in enumerate(csv.reader(io.StringIO(text, newline=''))):
+        if required <= {cell.strip() for cell in row}:
+            return row_number
+    return None
+
+def resolve_dtypes(file, dtype: dict, default: str | None = None, **read_kwargs) -> dict:
+    """
+    Maps a dtype mapping keyed by stripped column names onto the column names
+    as written in the file, so it can be passed to pd.read_csv.
+    Columns that are not in the file are left out; columns of the file that are
+    not in the mapping get `default`, if given.
+    """
+    resolved = {}
+    for col in read_csv_header(file, **read_kwargs):
+        if col.strip() in dtype:
+            resolved[col] = dtype[col.strip()]
+        elif default is not None:
+            resolved[col] = default
+    return resolved
+
+def resolve_columns(file, columns, **read_kwargs) -> list[str]:
+    """
+    Maps stripped column names onto the column names as written in the file, so
+    they can be passed to pd.read_csv as `usecols`.
+    Columns that are not in the file are left out.
+    """
+    columns = set(columns)
+    return [col for col in read_csv_header(file, **read_kwargs) if col.strip() in columns]
+
+def concat_frames(frames: list[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Concatenates DataFrames like pd.concat, but keeps categorical columns
+    categorical when the frames were parsed with different categories.
+    """
+    if len(frames) > 1:
+        categories = {}
+        for col in frames[0].columns:
+            dtypes = [df[col].dtype for df in frames]
+            if all(isinstance(dtype, pd.CategoricalDtype) for dtype in dtypes):
+                categories[col] = dtypes[0].categories
+                for dtype in dtypes[1:]:
+                    categories[col] = categories[col].union(dtype.categories)
+        if categories:
+            frames = [
+                df.assign(**{col: df[col].cat.set_categories(cats) for col, cats in categories.items()})
+                for df in frames
+            ]
+    return pd.concat(frames)
+
+def lenient_dtypes(dtype: dict) -> tuple[dict, dict]:
+    """
+    Splits a dtype mapping into the dtypes to parse with and the float columns to
+    convert afterwards with parse_numbers. Float columns are parsed as text, so a
+    stray value such as "TBD" does not fail the whole file.
+    """
+    numeric = {col: d for col, d in dtype.items() if pd.api.types.is_float_dtype(pd.api.types.pandas_dtype(d))}
+    return {**dtype, **dict.fromkeys(numeric, 'str')}, numeric
+
+def _numbers(values: pd.Series) -> pd.Series | None:
+    # The values as numbers, or None if any present value is not a number
+    try:
+        return pd.to_numeric(values)
+    except (ValueError, TypeError):
+        return None
+
+def parse_numbers(df: pd.DataFrame, numeric: dict) -> pd.DataFrame:
+    """
+    Converts the text columns of `numeric` that are in a DataFrame to their float
+    dtypes. A column holding any value that is not a number, e.g. "TBD" or
+    "1,234.50", is left as text, as pd.read_csv would read it, so no value is lost.
+    """
+    converted = {}
+    for col, dtype in numeric.items():
+        values = _numbers(df[col]) if col in df.columns else None
+        if values is not None:
+            converted[col] = values.astype(dtype)
+    return df.assign(**converted) if converted else df
+
+def infer_numbers(df: pd.DataFrame, columns) -> pd.DataFrame:
+    """
+    Converts the text columns in `columns` to numbers where every value present is
+    one, like pd.read_csv infers a whole column: int64, or float64 with missing or
+    decimal values. Columns with any other value stay text.
+    """
+    converted = {}
+    for col in columns:
+        values = _numbers(df[col]) if col in df.columns and not df.empty else None
+        if values is not None:
+            converted[col] = values
+    return df.assign(**converted) if converted else df
+
+def remove_unused_categories(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Drops the categories no row of a DataFrame uses from its categorical columns,
+    e.g. those of the countries filtered out.
+    """
+    columns = [col for col, dtype in df.dtypes.items() if isinstance(dtype, pd.CategoricalDtype)]
+    if not columns:
+        return df
+    return df.assign(**{col: df[col].cat.remove_unused_categories() for col in columns})
+
+def read_csv_filtered(file, selected_countries, country_col: str = 'Country',
+                      chunksize: int = CSV_CHUNK_SIZE, **read_kwargs) -> pd.DataFrame:
+    """
+    Reads a CSV file in chunks, keeping only the rows for the selected countries.
+    Rows for other countries are dropped as each chunk is parsed, so peak memory
+    depends on the selected slice rather than on the full file. Compressed files
+    are decompressed as they are parsed (see open_csv).
+
+    Args:
+        file: A path or file-like object (e.g. a Streamlit upload).
+        selected_countries: The country codes to keep, or None to keep every row.
+        country_col: The column holding the country code.
+        chunksize: The number of rows parsed per chunk.
+        **read_kwargs: Extra keyword arguments passed to pd.read_csv. The keys of a
+            `dtype` mapping and the names in `usecols` are matched against the
+            stripped column names; the country column is always read. Columns
+            without a declared dtype are read as text, so every chunk parses
+            them the same way, and converted to numbers afterwards if all their
+            values are (see infer_numbers). Float columns are converted the
+            same way (see parse_numbers).
+
+    Returns:
+        pd.DataFrame: The matching rows, with whitespace stripped from the headers.
+        If the country column is missing, an empty frame with the file's columns is
+        returned so the caller's column check can report it.
+    """
+    read_kwargs.setdefault('encoding', 'utf-8-sig')
+    dtype, numeric = lenient_dtypes(read_kwargs.pop('dtype', None) or {})
+    usecols = read_kwargs.pop('usecols', None)
+    # pandas infers types per chunk, so an undeclared column could come back as
+    # numbers in one chunk and text in the next; they are read as text and
+    # typed once all matching rows are in
+    read_kwargs['dtype'] = resolve_dtypes(file, dtype, default='str', **read_kwargs)
+    undeclared = [col.strip() for col in read_kwargs['dtype'] if col.strip() not in dtype]
+    if usecols is not None:
+        read_kwargs['usecols'] = resolve_columns(file, (*usecols, country_col), **read_kwargs)
+    matching_chunks = []
+    empty_df = None
+    with open_csv(file) as f, pd.read_csv(f, chunksize=chunksize, **read_kwargs) as reader:
+        for chunk in reader:
+            checkpoint()
+            chunk.columns = chunk.columns.str.strip()
+            if empty_df is None:
+                empty_df = parse_numbers(remove_unused_categories(chunk.iloc[0:0]), numeric)
+            if country_col not in chunk.columns:
+                return empty_df
+            if selected_countries is not None:
+                chunk = chunk[chunk[country_col].isin(selected_countries)]
+            if not chunk.empty:
+                matching_chunks.append(remove_unused_categories(chunk))
+
+    if not matching_chunks:
+        return empty_df
+    return infer_numbers(parse_numbers(concat_frames(matching_chunks), numeric), undeclared)
+
+def composite_key(df: pd.DataFrame, key_cols=KEY_COLUMNS) -> np.ndarray:
+    """
+    Hashes the key columns of each row into one 64-bit integer.
+    Non-text columns are compared by their string form, so a code parsed as a
+    number in one file still matches the same code parsed as text in another.
+    Categorical text columns hash the same as plain text columns.
+
+    Args:
+        df: The DataFrame to build keys for.
+        key_cols: The columns that together identify a record.
+
+    Returns:
+        np.ndarray: A uint64 key per row, in row order.
+    """
+    return pd.util.hash_pandas_object(key_frame(df, key_cols), index=False).to_numpy()
+
+def key_frame(df: pd.DataFrame, key_cols=KEY_COLUMNS) -> pd.DataFrame:
+    """
+    Returns the key columns of `df` as composite_key compares them: text columns
+    as they are, other columns by their string form.
+    """
+    return pd.DataFrame({col: _text_or_str(df[col]) for col in key_cols})
+
+def _text_or_str(values: pd.Series) -> pd.Series:
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        if pd.api.types.is_string_dtype(values.cat.categories):
+            return values
+    elif pd.api.types.is_string_dtype(values):
+        return values
+    return values.astype(str)
+
+def unique_key_mask(keys: np.ndarray) -> np.ndarray:
+    """
+    Returns a mask selecting the first row for each key, like drop_duplicates(keep='first').
+    """
+    return ~pd.Series(keys).duplicated(keep='first').to_numpy()
+
+def semi_join_mask(keys: np.ndarray, *other_keys: np.ndarray) -> np.ndarray:
+    """
+    Returns a mask selecting the rows whose key exists in every one of `other_keys`.
+    This filters like an inner merge against deduplicated keys, without building
+    the merged frame.
+    """
+    keys = pd.Series(keys)
+    mask = np.ones(len(keys), dtype=bool)
+    for keys_to_match in other_keys:
+        mask &= keys.isin(keys_to_match).to_numpy()
+    return mask
+
+def partition_by_country(df: pd.DataFrame, file_prefix: str, country_col: str = 'Country',
+                         drop_cols=EXPORT_DROP_COLUMNS,
+                         trailing_cols_to_drop: int = EXPORT_TRAILING_COLUMNS_TO_DROP) -> dict[str, pd.DataFrame]:
+    """
+    Splits a result into one export frame per country in a single pass.
+    Countries keep their order of first appearance, rows keep their order within
+    a country, and the export columns are trimmed once for the whole frame.
+
+    Args:
+        df: The processed DataFrame.
+        file_prefix: The interface name, e.g. "I38"; files are named "I38_<country>.xlsx".
+        country_col: The column to split on.
+        drop_cols: Helper columns to remove before export, if present.
+        trailing_cols_to_drop: The number of trailing columns to remove after drop_cols.
+
+    Returns:
+        dict[str, pd.DataFrame]: The per-country frames keyed by file name, ready for to_zip.
+        When the rows are already grouped by country, the frames are slices of `df`.
+    """
+    with stage("split by country", rows_in=len(df)) as s:
+        export_df = df.drop(columns=list(drop_cols), errors='ignore')
+        if trailing_cols_to_drop:
+            export_df = export_df.iloc[:, :-trailing_cols_to_drop]
+
+        codes, countries = pd.factorize(df[country_col])
+        keep = codes >= 0
+        if not keep.all():
+            export_df, codes = export_df[keep], codes[keep]
+        if (np.diff(codes) < 0).any():
+            order = np.argsort(codes, kind='stable')
+            export_df, codes = export_df.take(order), codes[order]
+
+        bounds = np.concatenate(([0], np.cumsum(np.bincount(codes, minlength=len(countries)))))
+        s.rows_out = len(export_df)
+    return {
+        f"{file_prefix}_{country}.xlsx": export_df.iloc[bounds[i]:bounds[i + 1]]
+        for i, country in enumerate(countries)
+    }
+
+def write_excel(df: pd.DataFrame, target) -> None:
+    """
+    Writes a pandas DataFrame as an Excel workbook to a path or writable file object.
+    This is the layout delivered to HOS.
+
+    Args:
+        df: The DataFrame to convert.
+        target: The destination, e.g. an open zip entry.
+    """
+    # Use a with statement to ensure the writer is closed properly
+    with pd.ExcelWriter(target, engine='openpyxl') as writer:
+        df.to_excel(writer, index=False, sheet_name='Sheet1')
+
+def write_excel_fast(df: pd.DataFrame, target) -> None:
+    """
+    Writes a pandas DataFrame as an Excel workbook using openpyxl's write-only mode.
+    Rows are streamed out with constant memory and without header styling, which is
+    much faster than write_excel for large dry runs.
+    """
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Sheet1')
+    sheet.append([str(col) for col in df.columns])
+    values = df.astype(object).where(df.notna(), None)
+    for row in values.itertuples(index=False, name=None):
+        sheet.append(row)
+    workbook.save(target)
+
+def write_csv(df: pd.DataFrame, target) -> None:
+    """
+    Writes a pandas DataFrame as a CSV file with a BOM so Excel detects UTF-8.
+    """
+    df.to_csv(target, index=False, encoding='utf-8-sig')
+
+def write_parquet(df: pd.DataFrame, target) -> None:
+    """
+    Writes a pandas DataFrame as a Parquet file (see file_store.frame_to_parquet).
+    """
+    frame_to_parquet(df, target, index=False)
+
+# Bump when a writer's output changes, so incremental exports stop reusing older files.
+EXPORT_LAYOUT_VERSION = 1
+
+# The manifest added to incremental archives, listing rebuilt and reused files.
+EXPORT_MANIFEST_NAME = "manifest.json"
+
+# Export formats by name: (file extension, writer function).
+EXPORT_FORMATS = {
+    'xlsx': ('.xlsx', write_excel),
+    'xlsx_fast': ('.xlsx', write_excel_fast),
+    'csv': ('.csv', write_csv),
+    'parquet': ('.parquet', write_parquet),
+}
+
+def export_file_name(file_name: str, fmt: str = DEFAULT_EXPORT_FORMAT) -> str:
+    """
+    Returns `file_name` with its extension replaced by the one for `fmt`.
+    """
+    extension, _ = EXPORT_FORMATS[fmt]
+    return os.path.splitext(file_name)[0] + extension
+
+def render_file(df: pd.DataFrame, fmt: str = DEFAULT_EXPORT_FORMAT) -> bytes:
+    """
+    Renders a pandas DataFrame in the given export format in memory.
+
+    Args:
+        df: The DataFrame to convert.
+        fmt: A key of EXPORT_FORMATS.
+
+    Returns:
+        bytes: The file contents.
+    """
+    _, writer = EXPORT_FORMATS[fmt]
+    output = io.BytesIO()
+    writer(df, output)
+    return output.getvalue()
 
 def to_excel(df: pd.DataFrame) -> bytes:
     """
@@ -12,25 +492,145 @@ def to_excel(df: pd.DataFrame) -> bytes:
     Returns:
         bytes: The Excel file as a byte string.
     """
-    output = io.BytesIO()
-    # Use a with statement to ensure the writer is closed properly
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        df.to_excel(writer, index=False, sheet_name='Sheet1')
-    processed_data = output.getvalue()
-    return processed_data
+    return render_file(df, 'xlsx')
 
-def to_zip(files: dict[str, pd.DataFrame]) -> bytes:
+def partition_fingerprint(df: pd.DataFrame, fmt: str = DEFAULT_EXPORT_FORMAT) -> str:
+    """
+    Returns a fingerprint of the file `df` exports to: its columns, dtypes and
+    values in row order, the export format and the layout version.
+    """
+    digest = hashlib.blake2b(f"{EXPORT_LAYOUT_VERSION}|{fmt}|".encode(), digest_size=16)
+    digest.update(repr([(str(col), str(dtype)) for col, dtype in df.dtypes.items()]).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+def export_workers(n_files: int, max_workers: int | None = None) -> int:
+    """
+    Returns the number of worker processes to render `n_files` files with,
+    or 1 when the export should run serially.
+    """
+    if n_files < PARALLEL_EXPORT_MIN_FILES:
+        return 1
+    return max(1, min(max_workers or os.cpu_count() or 1, n_files))
+
+def render_workbooks(dfs: list[pd.DataFrame], max_workers: int | None = None,
+                     fmt: str = DEFAULT_EXPORT_FORMAT):
+    """
+    Renders DataFrames to file bytes, yielding them in the order given.
+    Large batches are rendered on a process pool; small ones run serially.
+    Closing the generator, e.g. when an export is cancelled, drops the files
+    not yet started.
+
+    Args:
+        dfs: The DataFrames to render.
+        max_workers: The maximum number of worker processes. Defaults to the CPU count;
+            1 forces serial rendering.
+        fmt: A key of EXPORT_FORMATS.
+    """
+    render = partial(render_file, fmt=fmt)
+    workers = export_workers(len(dfs), max_workers)
+    if workers == 1:
+        for df in dfs:
+            yield render(df)
+        return
+
+    executor = ProcessPoolExecutor(max_workers=workers, mp_context=EXPORT_CONTEXT)
+    try:
+        yield from executor.map(render, dfs)
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+def _write_incremental(zip_file: zipfile.ZipFile, files: dict[str, pd.DataFrame], cache,
+                       max_workers: int | None, fmt: str) -> dict:
+    fingerprints = {file_name: partition_fingerprint(df, fmt) for file_name, df in files.items()}
+    stale = [file_name for file_name, fingerprint in fingerprints.items() if not cache.contains(fingerprint)]
+    manifest = {"format": fmt, "rebuilt": [], "reused": [], "fingerprints": {}}
+    with closing(render_workbooks([files[file_name] for file_name in stale], max_workers, fmt)) as rendered_files:
+        for i, (file_name, fingerprint) in enumerate(fingerprints.items()):
+            report_progress("files exported", i, len(files))
+            entry_name = export_file_name(file_name, fmt)
+            if file_name in stale:
+                file_bytes = next(rendered_files)
+                cache.put(fingerprint, file_bytes)
+                manifest["rebuilt"].append(entry_name)
+            else:
+                file_bytes = cache.get(fingerprint)
+                if file_bytes is None:
+                    # Evicted by another process since it was looked up
+                    file_bytes = render_file(files[file_name], fmt)
+                    cache.put(fingerprint, file_bytes)
+                manifest["reused"].append(entry_name)
+            zip_file.writestr(entry_name, file_bytes)
+            manifest["fingerprints"][entry_name] = fingerprint
+    zip_file.writestr(EXPORT_MANIFEST_NAME, json.dumps(manifest, indent=2))
+    cache.evict()
+    return manifest
+
+def write_zip(files: dict[str, pd.DataFrame], target, max_workers: int | None = None,
+              fmt: str = DEFAULT_EXPORT_FORMAT, cache=None) -> dict | None:
+    """
+    Writes a zip archive of exported files to a path or writable file object.
+    File names keep their stem and get the extension of `fmt`.
+    Serial exports stream each file straight into its zip entry; parallel
+    exports (see render_workbooks) write each rendered file as it arrives.
+    Entries are written in the dictionary's order.
+
+    With a `cache` (an output_cache.OutputCache), the export is incremental:
+    files whose content fingerprint is cached are reused instead of rendered,
+    and a manifest of the rebuilt and reused files is added to the archive.
+
+    Returns:
+        dict | None: The manifest of an incremental export.
+    """
+    _, writer = EXPORT_FORMATS[fmt]
+    rows = sum(len(df) for df in files.values())
+    with stage("export", rows_in=rows) as s, zipfile.ZipFile(target, "w", zipfile.ZIP_DEFLATED, False) as zip_file:
+        s.rows_out = rows
+        if cache is not None:
+            return _write_incremental(zip_file, files, cache, max_workers, fmt)
+        workers = export_workers(len(files), max_workers)
+        if workers > 1:
+            with closing(render_workbooks(list(files.values()), workers, fmt)) as rendered_files:
+                for i, (file_name, file_bytes) in enumerate(zip(files.keys(), rendered_files)):
+                    report_progress("files exported", i, len(files))
+                    zip_file.writestr(export_file_name(file_name, fmt), file_bytes)
+        else:
+            for i, (file_name, df) in enumerate(files.items()):
+                report_progress("files exported", i, len(files))
+                with zip_file.open(export_file_name(file_name, fmt), "w") as entry:
+                    writer(df, entry)
+
+def to_zip(files: dict[str, pd.DataFrame], max_workers: int | None = None,
+           fmt: str = DEFAULT_EXPORT_FORMAT, cache=None) -> bytes:
     """
     Creates a zip archive from a dictionary of DataFrames.
     Each key-value pair in the dictionary corresponds to a file in the zip archive,
     where the key is the filename and the value is the DataFrame.
     """
     zip_buffer = io.BytesIO()
-    with zipfile.ZipFile(zip_buffer, "a", zipfile.ZIP_DEFLATED, False) as zip_file:
-        for file_name, df in files.items():
-            # Convert DataFrame to Excel bytes
-            excel_bytes = to_excel(df)
-            # Write the bytes to the zip file
-            zip_file.writestr(file_name, excel_bytes)
-    
-    return zip_buffer.getvalue()
\ No newline at end of file
+    write_zip(files, zip_buffer, max_workers, fmt, cache)
+    return zip_buffer.getvalue()
+
+def to_zip_file(files: dict[str, pd.DataFrame], max_workers: int | None = None,
+                spill_threshold: int = ZIP_SPILL_THRESHOLD,
+                fmt: str = DEFAULT_EXPORT_FORMAT, cache=None) -> tempfile.SpooledTemporaryFile:
+    """
+    Creates a zip archive like to_zip, but in a temporary file that stays in memory
+    only until it grows past `spill_threshold` bytes and is then moved to disk.
+
+    Returns:
+        tempfile.SpooledTemporaryFile: The archive, rewound to the start. It is
+        deleted when closed or garbage collected.
+    """
+    zip_spool = tempfile.SpooledTemporaryFile(max_size=spill_threshold, suffix=".zip")
+    write_zip(files, zip_spool, max_workers, fmt, cache)
+    zip_spool.seek(0)
+    return zip_spool
+
+def read_archive(zip_spool) -> bytes:
+    """
+    Reads a whole archive created by to_zip_file. Pass it to st.download_button
+    via functools.partial so the file is only read when the download is clicked.
+    """
+    zip_spool.seek(0)
+    return zip_spool.read()